@@ -0,0 +1,12 @@
+# __main__.py
+# `python -m countess ...` from the repository root. The modules import each other as
+# top-level names, so this directory goes on sys.path first.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import main  # noqa: E402
+
+main()
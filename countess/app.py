@@ -9,14 +9,38 @@
 from __future__ import annotations
 
 import json
+import os
 import time
+import copy
 import datetime
-from dataclasses import dataclass
+import functools
+import itertools
+import threading
+from collections import deque
 from pathlib import Path
-from typing import List, Tuple, Optional
+from types import MappingProxyType
+from typing import List, Sequence, Tuple, Optional
 
 import numpy as np
 import streamlit as st
+import streamlit.components.v1 as components
+
+from engine import (
+    CreditManager,
+    RoundResult,
+    Rules,
+    RunConfig,
+    RunningStats,
+    SurvivalEconomy,
+    event_writer,
+    flush_event_writers,
+    new_sim_state,
+    play_hand,
+)
+from checkpoint import capture, checkpoint_writer, flush_checkpoint_writers, read_checkpoint, restore
+from broadcast import Hub, live_hub
+from replay import ReplayIndex
+from runlog import EventRing
 
 
 # =========================
@@ -28,422 +52,6 @@ ENGINE_TAG = "countess-engine"
 SIM_NOTE = "SIMULATION ONLY"
 
 
-# =========================
-# CONFIG
-# =========================
-@dataclass(frozen=True)
-class Rules:
-    decks: int = 6
-    dealer_stands_soft_17: bool = True  # S17
-    double_after_split: bool = True     # DAS
-    allow_resplit_aces: bool = False
-    max_splits: int = 3
-    blackjack_payout: float = 1.5       # 3:2
-    penetration: float = 0.75           # reshuffle when remaining < (1-penetration)
-
-
-@dataclass
-class SurvivalEconomy:
-    initial_credits: float = 50.0
-    burn_per_hand: float = 0.0005
-    tax_rate_on_positive_profit: float = 0.20
-    refill_threshold: float = 5.0
-    refill_amount: float = 20.0
-    death_threshold: float = 0.0
-
-
-@dataclass
-class RunConfig:
-    seed: int = 7
-    hands_cap: int = 500_000
-    base_bet: float = 1.0
-    initial_bankroll: float = 500.0
-
-
-# =========================
-# CARDS / SHOE
-# =========================
-SUITS = ["♠", "♥", "♦", "♣"]
-RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
-
-
-def rank_value(rank: str) -> int:
-    if rank == "A":
-        return 1
-    if rank in ["J", "Q", "K"]:
-        return 10
-    return int(rank)
-
-
-def make_shoe_cards(decks: int) -> List[Tuple[str, str, int]]:
-    cards = []
-    for _ in range(decks):
-        for suit in SUITS:
-            for rank in RANKS:
-                cards.append((rank, suit, rank_value(rank)))
-    return cards
-
-
-class Shoe:
-    def __init__(self, decks: int, rng: np.random.Generator):
-        self.decks = decks
-        self.rng = rng
-        self.cards = make_shoe_cards(decks)
-        self.shuffle()
-
-    def shuffle(self) -> None:
-        self.rng.shuffle(self.cards)
-        self.i = 0
-
-    def remaining(self) -> int:
-        return len(self.cards) - self.i
-
-    def deal(self) -> Tuple[str, str, int]:
-        c = self.cards[self.i]
-        self.i += 1
-        return c
-
-    def needs_reshuffle(self, penetration: float) -> bool:
-        return self.remaining() < int(len(self.cards) * (1 - penetration))
-
-
-# =========================
-# HAND UTILS
-# =========================
-@dataclass
-class Hand:
-    cards: List[Tuple[str, str, int]]
-    doubled: bool = False
-    is_split_aces: bool = False
-
-    def add(self, card: Tuple[str, str, int]) -> None:
-        self.cards.append(card)
-
-
-def cards_values(cards: List[Tuple[str, str, int]]) -> List[int]:
-    return [c[2] for c in cards]
-
-
-def hand_value(cards: List[Tuple[str, str, int]]) -> Tuple[int, bool]:
-    vals = cards_values(cards)
-    total = sum(vals)
-    aces = sum(1 for v in vals if v == 1)
-    is_soft = False
-    while aces > 0 and total + 10 <= 21:
-        total += 10
-        aces -= 1
-        is_soft = True
-    return total, is_soft
-
-
-def is_blackjack(cards: List[Tuple[str, str, int]]) -> bool:
-    if len(cards) != 2:
-        return False
-    vals = cards_values(cards)
-    return (1 in vals) and (10 in vals)
-
-
-def is_pair(cards: List[Tuple[str, str, int]]) -> bool:
-    if len(cards) != 2:
-        return False
-    return cards[0][2] == cards[1][2]
-
-
-def card_str(card: Tuple[str, str, int]) -> str:
-    r, s, _ = card
-    return f"{r}{s}"
-
-
-# =========================
-# BASIC STRATEGY (S17 + DAS-ish)
-# =========================
-def basic_strategy(player_cards: List[Tuple[str, str, int]], dealer_upcard: Tuple[str, str, int]) -> str:
-    up = dealer_upcard[2] if dealer_upcard[2] != 1 else 1
-
-    # Pairs
-    if is_pair(player_cards):
-        v = player_cards[0][2]
-        if v == 1:
-            return "P"  # AA
-        if v == 8:
-            return "P"  # 88
-        if v == 10:
-            return "S"  # TT
-        if v == 9:
-            return "P" if up in [2, 3, 4, 5, 6, 8, 9] else "S"
-        if v == 7:
-            return "P" if up in [2, 3, 4, 5, 6, 7] else "H"
-        if v == 6:
-            return "P" if up in [2, 3, 4, 5, 6] else "H"
-        if v == 5:
-            return "D" if up in [2, 3, 4, 5, 6, 7, 8, 9] else "H"
-        if v == 4:
-            return "P" if up in [5, 6] else "H"
-        if v in [2, 3]:
-            return "P" if up in [2, 3, 4, 5, 6, 7] else "H"
-
-    total, soft = hand_value(player_cards)
-
-    # Soft totals
-    if soft:
-        if total <= 17:
-            if total in [13, 14]:
-                return "D" if up in [5, 6] else "H"
-            if total in [15, 16]:
-                return "D" if up in [4, 5, 6] else "H"
-            if total == 17:
-                return "D" if up in [3, 4, 5, 6] else "H"
-        if total == 18:
-            if up in [3, 4, 5, 6]:
-                return "D"
-            if up in [2, 7, 8]:
-                return "S"
-            return "H"
-        return "S"
-
-    # Hard totals
-    if total <= 8:
-        return "H"
-    if total == 9:
-        return "D" if up in [3, 4, 5, 6] else "H"
-    if total == 10:
-        return "D" if up in [2, 3, 4, 5, 6, 7, 8, 9] else "H"
-    if total == 11:
-        return "D" if up != 1 else "H"
-    if total == 12:
-        return "S" if up in [4, 5, 6] else "H"
-    if total in [13, 14, 15, 16]:
-        return "S" if up in [2, 3, 4, 5, 6] else "H"
-    return "S"
-
-
-# =========================
-# ENGINE
-# =========================
-@dataclass
-class RoundResult:
-    profit: float
-    bet: float
-    outcome: str
-    dealer_total: int
-    player_hands: int
-
-
-class BlackjackEnv:
-    def __init__(self, rules: Rules, rng: np.random.Generator):
-        self.rules = rules
-        self.rng = rng
-        self.shoe = Shoe(rules.decks, rng)
-
-    def _dealer_play(self, dealer_cards: List[Tuple[str, str, int]], trace: List[dict]) -> int:
-        while True:
-            total, soft = hand_value(dealer_cards)
-            if total > 21:
-                return total
-            if total > 17:
-                return total
-            if total == 17 and soft and not self.rules.dealer_stands_soft_17:
-                c = self.shoe.deal()
-                dealer_cards.append(c)
-                trace.append({"actor": "dealer", "action": "HIT", "card": card_str(c)})
-                continue
-            if total == 17 and soft and self.rules.dealer_stands_soft_17:
-                return total
-            if total < 17:
-                c = self.shoe.deal()
-                dealer_cards.append(c)
-                trace.append({"actor": "dealer", "action": "HIT", "card": card_str(c)})
-                continue
-
-    def _settle_hand(self, hand: Hand, dealer_total: int, bet: float, dealer_bj: bool) -> Tuple[float, str]:
-        total, _ = hand_value(hand.cards)
-        if total > 21:
-            return -bet, "LOSE"
-
-        player_bj = is_blackjack(hand.cards) and not hand.is_split_aces
-        if player_bj and not dealer_bj:
-            return bet * self.rules.blackjack_payout, "BJ"
-        if dealer_bj and not player_bj:
-            return -bet, "LOSE"
-
-        if dealer_total > 21:
-            return bet, "WIN"
-        if total > dealer_total:
-            return bet, "WIN"
-        if total < dealer_total:
-            return -bet, "LOSE"
-        return 0.0, "PUSH"
-
-    def play_round_verbose(self, bet: float) -> Tuple[RoundResult, dict]:
-        trace: List[dict] = []
-
-        reshuffle = False
-        if self.shoe.needs_reshuffle(self.rules.penetration):
-            reshuffle = True
-            self.shoe.shuffle()
-            trace.append({"actor": "shoe", "action": "SHUFFLE"})
-
-        p1 = self.shoe.deal()
-        d1 = self.shoe.deal()
-        p2 = self.shoe.deal()
-        d2 = self.shoe.deal()
-
-        player = Hand([p1, p2])
-        dealer_cards = [d1, d2]
-        dealer_up = d1
-        dealer_bj = is_blackjack(dealer_cards)
-
-        trace.append({"actor": "shoe", "action": "DEAL", "to": "player", "card": card_str(p1)})
-        trace.append({"actor": "shoe", "action": "DEAL", "to": "dealer", "card": card_str(d1)})
-        trace.append({"actor": "shoe", "action": "DEAL", "to": "player", "card": card_str(p2)})
-        trace.append({"actor": "shoe", "action": "DEAL", "to": "dealer", "card": "🂠"})
-
-        hands: List[Hand] = [player]
-        split_count = 0
-
-        i = 0
-        while i < len(hands):
-            h = hands[i]
-
-            # Split aces: one card only (typical rules)
-            if h.is_split_aces and len(h.cards) >= 2:
-                i += 1
-                continue
-
-            while True:
-                total, _ = hand_value(h.cards)
-                if total >= 21:
-                    break
-
-                action = basic_strategy(h.cards, dealer_up)
-
-                # Split
-                if (
-                    action == "P"
-                    and split_count < self.rules.max_splits
-                    and len(h.cards) == 2
-                    and is_pair(h.cards)
-                ):
-                    split_count += 1
-                    c0 = h.cards[0]
-                    c1 = h.cards[1]
-                    trace.append({"actor": "player", "action": "SPLIT"})
-
-                    h.cards = [c0, self.shoe.deal()]
-                    trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{i+1}", "card": card_str(h.cards[1])})
-
-                    new_hand = Hand([c1, self.shoe.deal()])
-                    trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{len(hands)+1}", "card": card_str(new_hand.cards[1])})
-
-                    if c0[2] == 1:
-                        h.is_split_aces = True
-                        new_hand.is_split_aces = True
-
-                    hands.append(new_hand)
-                    continue
-
-                # Double
-                if action == "D" and len(h.cards) == 2:
-                    h.doubled = True
-                    trace.append({"actor": "player", "action": "DOUBLE", "hand": i + 1})
-                    c = self.shoe.deal()
-                    h.add(c)
-                    trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{i+1}", "card": card_str(c)})
-                    break
-
-                # Stand
-                if action == "S":
-                    trace.append({"actor": "player", "action": "STAND", "hand": i + 1})
-                    break
-
-                # Hit
-                trace.append({"actor": "player", "action": "HIT", "hand": i + 1})
-                c = self.shoe.deal()
-                h.add(c)
-                trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{i+1}", "card": card_str(c)})
-
-            i += 1
-
-        trace.append({"actor": "dealer", "action": "REVEAL", "card": card_str(d2)})
-        dealer_total = self._dealer_play(dealer_cards, trace)
-
-        profit_total = 0.0
-        outcomes = []
-        for h in hands:
-            hb = bet * (2.0 if h.doubled else 1.0)
-            p, out = self._settle_hand(h, dealer_total, hb, dealer_bj)
-            profit_total += p
-            outcomes.append(out)
-
-        outcome = "PUSH"
-        if "LOSE" in outcomes and "WIN" not in outcomes and "BJ" not in outcomes:
-            outcome = "LOSE"
-        if "WIN" in outcomes:
-            outcome = "WIN"
-        if "BJ" in outcomes:
-            outcome = "BJ"
-
-        trace.append({"actor": "settle", "action": outcome, "pnl": float(profit_total)})
-
-        rr = RoundResult(
-            profit=float(profit_total),
-            bet=float(bet),
-            outcome=outcome,
-            dealer_total=int(dealer_total),
-            player_hands=len(hands),
-        )
-
-        payload = {
-            "dealer_cards_ui": [card_str(d1), card_str(d2)],
-            "player_hands_ui": [[card_str(c) for c in h.cards] for h in hands],
-            "trace": trace,
-            "shoe_remaining": int(self.shoe.remaining()),
-            "reshuffle": bool(reshuffle),
-        }
-        return rr, payload
-
-
-# =========================
-# SURVIVAL ECONOMY
-# =========================
-class ExperimentOverError(RuntimeError):
-    pass
-
-
-class CreditManager:
-    def __init__(self, econ: SurvivalEconomy):
-        self.econ = econ
-        self.credits = float(econ.initial_credits)
-
-    def step(self, profit: float) -> dict:
-        self.credits -= self.econ.burn_per_hand
-
-        if profit > 0:
-            self.credits += profit * self.econ.tax_rate_on_positive_profit
-
-        refill = False
-        if self.credits <= self.econ.refill_threshold:
-            self.credits += self.econ.refill_amount
-            refill = True
-
-        if self.credits <= self.econ.death_threshold:
-            raise ExperimentOverError("Credits depleted. The experiment ends.")
-
-        return {"credits": self.credits, "refill": refill}
-
-
-# =========================
-# OPTIONAL LOGGING
-# =========================
-def append_jsonl(log_path: Optional[str], record: dict) -> None:
-    if not log_path:
-        return
-    p = Path(log_path)
-    p.parent.mkdir(parents=True, exist_ok=True)
-    with open(p, "a", encoding="utf-8") as f:
-        f.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-
 # =========================
 # WINDOWS DESKTOP + TERMINAL CSS
 # =========================
@@ -777,10 +385,14 @@ label { color: rgba(255,255,255,0.75) !important; }
 # =========================
 def windows_shell_frame(inner_html: str, title: str) -> str:
     now = datetime.datetime.now()
-    t1 = now.strftime("%H:%M")
-    t2 = now.strftime("%d.%m.%Y")
+    prefix, suffix = _shell_frame_parts(title, now.strftime("%H:%M"), now.strftime("%d.%m.%Y"))
+    return prefix + inner_html + suffix
 
-    return f"""
+
+@functools.lru_cache(maxsize=8)
+def _shell_frame_parts(title: str, t1: str, t2: str) -> Tuple[str, str]:
+    # Desktop, window chrome and taskbar around the content; rebuilt only when the clock minute changes.
+    prefix = f"""
 <div class="win-desktop">
   <div class="desktop-icons">
     <div class="dicon"><div class="ico">🗂</div><div>This PC</div></div>
@@ -801,7 +413,8 @@ def windows_shell_frame(inner_html: str, title: str) -> str:
       </div>
     </div>
     <div class="win-content">
-      {inner_html}
+      """
+    suffix = f"""
     </div>
   </div>
 
@@ -821,32 +434,37 @@ def windows_shell_frame(inner_html: str, title: str) -> str:
   </div>
 </div>
 """
+    return prefix, suffix
 
 
 # =========================
 # WINDOWS TERMINAL HTML
 # =========================
-def term_html(lines: list[dict], title: str, tab_label: str = "PowerShell", cwd: str = r"C:\countess") -> str:
-    rows = []
-    for x in lines[-80:]:
-        lvl = x.get("level", "")
-        msg_cls = "wtmsg"
-        if lvl == "ok":
-            msg_cls += " ok"
-        elif lvl == "warn":
-            msg_cls += " warn"
-        elif lvl == "bad":
-            msg_cls += " bad"
-        elif lvl == "dim":
-            msg_cls += " dim"
-
-        rows.append(
-            f"<div class='wtline'>"
-            f"<div class='wtts'>{x.get('t','')}</div>"
-            f"<div class='wttag'>{x.get('tag','')}</div>"
-            f"<div class='{msg_cls}'>{x.get('msg','')}</div>"
-            f"</div>"
-        )
+TERM_HISTORY = 600  # lines kept in state["term"]
+TERM_VISIBLE = 80   # lines rendered in the terminal pane
+
+_TERM_MSG_CLASSES = {"ok": "wtmsg ok", "warn": "wtmsg warn", "bad": "wtmsg bad", "dim": "wtmsg dim"}
+
+
+def term_row_html(t: str, tag: str, msg: str, level: str = "") -> str:
+    msg_cls = _TERM_MSG_CLASSES.get(level, "wtmsg")
+    return (
+        f"<div class='wtline'>"
+        f"<div class='wtts'>{t}</div>"
+        f"<div class='wttag'>{tag}</div>"
+        f"<div class='{msg_cls}'>{msg}</div>"
+        f"</div>"
+    )
+
+
+def term_html(lines: Sequence[dict], title: str, tab_label: str = "PowerShell", cwd: str = r"C:\countess") -> str:
+    # Rows carry the HTML cached by term_log; only the newest TERM_VISIBLE are joined.
+    tail = list(itertools.islice(reversed(lines), TERM_VISIBLE))
+    tail.reverse()
+    rows = [
+        x.get("html") or term_row_html(x.get("t", ""), x.get("tag", ""), x.get("msg", ""), x.get("level", ""))
+        for x in tail
+    ]
 
     body = "".join(rows) if rows else "<div class='wtmsg dim'>—</div>"
     host = title
@@ -885,14 +503,30 @@ def term_html(lines: list[dict], title: str, tab_label: str = "PowerShell", cwd:
 
 
 def term_log(state: dict, tag: str, msg: str, level: str = "") -> None:
-    state["term"].append({"t": time.strftime("%H:%M:%S"), "tag": tag, "msg": msg, "level": level})
-    state["term"] = state["term"][-600:]
+    # state["term"] is a bounded deque, so appends never copy the history.
+    t = time.strftime("%H:%M:%S")
+    state["term"].append({"t": t, "tag": tag, "msg": msg, "level": level, "html": term_row_html(t, tag, msg, level)})
+    state["term_seq"] = state.get("term_seq", 0) + 1
+
+
+def term_panel_html(state: dict) -> str:
+    # The terminal pane only changes when a line is logged, not on every playback frame.
+    # Cached on the UI-owned "ui" dict so snapshot views (SimWorker) share it.
+    ui = state["ui"]
+    key = (state.get("term_seq", 0), ui["win_host"], ui["tab"], ui["cwd"])
+    cached = ui.get("_term_panel")
+    if cached is None or cached[0] != key:
+        cached = (key, term_html(state["term"], title=ui["win_host"], tab_label=ui["tab"], cwd=ui["cwd"]))
+        ui["_term_panel"] = cached
+    return cached[1]
 
 
 # =========================
 # TABLE HTML
 # =========================
+@functools.lru_cache(maxsize=None)
 def card_html(card: str, hidden: bool = False) -> str:
+    # At most 52 faces plus the back, so every fragment is built once per process.
     if hidden:
         return '<div class="card back">🂠</div>'
     suit = card[-1]
@@ -908,12 +542,27 @@ def card_html(card: str, hidden: bool = False) -> str:
 
 
 def cards_row_html(cards: List[str], hide_hole_second: bool = False) -> str:
+    return _cards_row_html(tuple(cards), hide_hole_second)
+
+
+@functools.lru_cache(maxsize=4096)
+def _cards_row_html(cards: Tuple[str, ...], hide_hole_second: bool) -> str:
     items = []
     for i, c in enumerate(cards):
         items.append(card_html(c, hidden=(hide_hole_second and i == 1)))
     return f'<div class="cards-row">{"".join(items)}</div>'
 
 
+@functools.lru_cache(maxsize=4096)
+def _hand_block_html(idx: int, cards: Tuple[str, ...]) -> str:
+    return f"""
+        <div class="hand-block">
+          <div class="hand-title">PLAYER HAND {idx+1}</div>
+          {_cards_row_html(cards, False)}
+        </div>
+        """
+
+
 def table_html(
     dealer_cards: List[str],
     player_hands: List[List[str]],
@@ -922,14 +571,7 @@ def table_html(
     outcome: str,
     pnl: float,
 ) -> str:
-    hands_html = ""
-    for idx, hand in enumerate(player_hands):
-        hands_html += f"""
-        <div class="hand-block">
-          <div class="hand-title">PLAYER HAND {idx+1}</div>
-          {cards_row_html(hand, hide_hole_second=False)}
-        </div>
-        """
+    hands_html = "".join(_hand_block_html(idx, tuple(hand)) for idx, hand in enumerate(player_hands))
 
     pnl_color = "rgba(255,255,255,0.85)"
     if pnl > 0:
@@ -959,33 +601,71 @@ def table_html(
 # =========================
 # STATE / SIM
 # =========================
-def init_state(cfg: RunConfig, rules: Rules, econ: SurvivalEconomy) -> dict:
-    rng = np.random.default_rng(cfg.seed)
-    env = BlackjackEnv(rules, rng)
-    credits = CreditManager(econ)
-
-    state = {
-        "rng": rng,
-        "cfg": cfg,
-        "rules": rules,
-        "econ": econ,
-        "env": env,
-        "credits": credits,
-        "bankroll": float(cfg.initial_bankroll),
-        "net_profit": 0.0,
-        "hand": 0,
-        "peak_bankroll": float(cfg.initial_bankroll),
-        "max_drawdown": 0.0,
-        "wins": 0,
-        "pushes": 0,
-        "losses": 0,
-        "bjs": 0,
-        "status": "ALIVE",
-        "events": [],
+EVENTS_WINDOW = 2048  # per-hand records kept in memory; full history goes to the log
+
+
+def app_run_config() -> RunConfig:
+    # COUNTESS_CHECKPOINT=<path> keeps the run across refreshes and restarts.
+    return RunConfig(checkpoint_path=os.environ.get("COUNTESS_CHECKPOINT", ""))
+
+
+def init_state(cfg: RunConfig, rules: Rules, econ: SurvivalEconomy, resume: bool = True) -> dict:
+    # With resume and an existing cfg.checkpoint_path, the run continues from that snapshot.
+    state = attach_ui(new_sim_state(cfg, rules, econ))
+    snap = read_checkpoint(cfg.checkpoint_path) if resume and cfg.checkpoint_path else None
+    if snap is not None:
+        try:
+            restore(state, snap)
+            term_log(state, "RESUME", f"hand {state['hand']:,} from {cfg.checkpoint_path} bankroll=${state['bankroll']:.2f} credits=${state['credits'].credits:.2f}", "warn")
+        except ValueError as e:
+            term_log(state, "RESUME", f"ignored {cfg.checkpoint_path}: {e}", "bad")
+    return state
+
+
+def seek_state(index: ReplayIndex, n: int) -> dict:
+    # Fresh UI state on hand n of an indexed run: that hand is dealt with its trace, the run
+    # continues from there like any other.
+    state = attach_ui(index.seek(n))
+    term_log(state, "SEEK", f"hand {n:,} of {index.hands:,} · checkpoint every {index.every:,}", "warn")
+    compute_one_hand(state, None, verbose=True)
+    return state
+
+
+def attach_ui(state: dict) -> dict:
+    # Adds the UI keys to a sim state and logs the boot lines.
+    cfg, rules, econ = state["cfg"], state["rules"], state["econ"]
+    state.update(ui_state())
+
+    term_log(state, "BOOT", f"{ENGINE_TAG} starting…", "dim")
+    flags = ["S17" if rules.dealer_stands_soft_17 else "H17", "DAS" if rules.double_after_split else "NDAS"]
+    if rules.allow_resplit_aces:
+        flags.append("RSA")
+    line = f"rules={','.join(flags)} decks={rules.decks} pen={rules.penetration:.2f} chart={state['env'].strategy.name}"
+    if cfg.bet_policy != RunConfig.bet_policy:
+        line += f" bet={cfg.bet_policy}"
+    if cfg.deviations:
+        line += f" deviations={cfg.deviations}"
+    term_log(state, "CFG", line, "dim")
+    term_log(state, "COUNT", f"system={cfg.count_system}", "dim")
+    term_log(state, "ECON", f"credits=${state['credits'].credits:.2f} burn/hand=${econ.burn_per_hand:.4f} tax={econ.tax_rate_on_positive_profit:.2f}", "dim")
+    term_log(state, "NOTE", TAGLINE, "dim")
+    return state
+
+
+def ui_state() -> dict:
+    # UI keys (event window, terminal, playback, HUD) without a simulation; on its own, a
+    # live viewer's whole session state.
+    # HUD cosmetics draw from their own generator so state["rng"] only ever shuffles the shoe
+    # and a seed plays the same hands here, in farm.py and in `python -m countess run`.
+    fx = np.random.default_rng()
+    return {
+        "events": EventRing(EVENTS_WINDOW),
         "last_rr": None,
         "last_payload": None,
+        "shoe_remaining": None,
         "_cinematic_pause_s": 0.0,
-        "term": [],
+        "term": deque(maxlen=TERM_HISTORY),
+        "term_seq": 0,
         "playback": {
             "active": False,
             "trace": [],
@@ -1003,35 +683,14 @@ def init_state(cfg: RunConfig, rules: Rules, econ: SurvivalEconomy) -> dict:
             "win_host": "DESKTOP-7K3M4",
             "cwd": r"C:\countess",
             "tab": "PowerShell",
-            "fps": int(rng.choice([30, 60])),
-            "ping": int(rng.integers(18, 70)),
-            "viewers": int(rng.integers(80, 1100)),
-            "viewers_target": int(rng.integers(120, 1800)),
+            "fps": int(fx.choice([30, 60])),
+            "ping": int(fx.integers(18, 70)),
+            "viewers": int(fx.integers(80, 1100)),
+            "viewers_target": int(fx.integers(120, 1800)),
             "started_at": time.time(),
         },
     }
 
-    term_log(state, "BOOT", f"{ENGINE_TAG} starting…", "dim")
-    term_log(state, "CFG", f"rules=S17,DAS decks={rules.decks} pen={rules.penetration:.2f}", "dim")
-    term_log(state, "ECON", f"credits=${credits.credits:.2f} burn/hand=${econ.burn_per_hand:.4f} tax={econ.tax_rate_on_positive_profit:.2f}", "dim")
-    term_log(state, "NOTE", TAGLINE, "dim")
-    return state
-
-
-def update_drawdown_and_counters(state: dict, outcome: str):
-    state["peak_bankroll"] = max(state["peak_bankroll"], state["bankroll"])
-    dd = state["peak_bankroll"] - state["bankroll"]
-    state["max_drawdown"] = max(state["max_drawdown"], dd)
-
-    if outcome == "WIN":
-        state["wins"] += 1
-    elif outcome == "PUSH":
-        state["pushes"] += 1
-    elif outcome == "LOSE":
-        state["losses"] += 1
-    elif outcome == "BJ":
-        state["bjs"] += 1
-
 
 def evolve_fake_net(state: dict, intensity: float = 1.0):
     ui = state["ui"]
@@ -1050,52 +709,41 @@ def evolve_fake_net(state: dict, intensity: float = 1.0):
     ui["ping"] = int(max(12.0, min(240.0, base + spike)))
 
 
-def compute_one_hand(state: dict, log_path: Optional[str]) -> None:
+def compute_one_hand(state: dict, log_path: Optional[str], verbose: bool = True) -> None:
     cfg: RunConfig = state["cfg"]
-    env: BlackjackEnv = state["env"]
     credits: CreditManager = state["credits"]
 
-    if state["status"] == "DEAD" or state["hand"] >= cfg.hands_cap:
-        return
+    # A hand that may end the run is always traced so it can be played back.
+    if not verbose and (state["hand"] + 1 >= cfg.hands_cap or credits.at_risk()):
+        verbose = True
 
-    if state["bankroll"] <= 0:
-        state["hand"] += 1
-        term_log(state, "BANKROLL", "0.00 — cannot bet.", "bad")
+    broke = state["bankroll"] <= 0 and state["status"] != "DEAD" and state["hand"] < cfg.hands_cap
+    step = play_hand(state, verbose)
+    if step is None:
+        if broke:
+            term_log(state, "BANKROLL", "0.00 — cannot bet.", "bad")
         return
+    rr, payload, rec, reshuffle = step
+    shoe_remaining = rec["shoe_remaining"]
+    refill = rec["refill"]
+
+    # last_rr / last_payload hold the last *traced* hand, so a trace-free stretch (SimWorker,
+    # autoplay batches) still leaves a hand to show and play back.
+    if payload is not None:
+        state["last_rr"] = rr
+        state["last_payload"] = payload
+    state["shoe_remaining"] = shoe_remaining
 
-    bet = float(cfg.base_bet)
-    rr, payload = env.play_round_verbose(bet=bet)
-
-    state["bankroll"] += rr.profit
-    state["net_profit"] += rr.profit
-    state["hand"] += 1
-    update_drawdown_and_counters(state, rr.outcome)
-
-    refill = False
-    try:
-        cstat = credits.step(rr.profit)
-        refill = bool(cstat["refill"])
-        state["status"] = "ALIVE"
-    except ExperimentOverError:
-        state["status"] = "DEAD"
-
-    state["last_rr"] = rr
-    state["last_payload"] = payload
-
-    rec = {
-        "hand": state["hand"],
-        "bankroll": state["bankroll"],
-        "credits": float(credits.credits),
-        "net_profit": state["net_profit"],
-        "profit": rr.profit,
-        "bet": rr.bet,
-        "outcome": rr.outcome,
-        "refill": refill,
-        "status": state["status"],
-        "shoe_remaining": payload.get("shoe_remaining"),
-    }
     state["events"].append(rec)
-    append_jsonl(log_path, rec)
+    writer = event_writer(log_path)
+    if writer is not None:
+        writer.write(rec)
+        if state["status"] == "DEAD":
+            writer.flush()
+    if cfg.checkpoint_path and cfg.checkpoint_every and (
+        state["hand"] % cfg.checkpoint_every == 0 or state["status"] == "DEAD"
+    ):
+        checkpoint_writer(cfg.checkpoint_path).submit(capture(state))
 
     lvl = "ok" if rr.profit > 0 else "bad" if rr.profit < 0 else "dim"
     term_log(
@@ -1105,8 +753,8 @@ def compute_one_hand(state: dict, log_path: Optional[str]) -> None:
         lvl,
     )
 
-    if payload.get("reshuffle"):
-        term_log(state, "SHOE", f"reshuffle · remaining={payload.get('shoe_remaining')}", "warn")
+    if reshuffle:
+        term_log(state, "SHOE", f"reshuffle · remaining={shoe_remaining}", "warn")
 
     clvl = "warn" if float(credits.credits) < 8 else "dim"
     term_log(state, "CREDITS", f"{float(credits.credits):.2f} remaining", clvl)
@@ -1238,17 +886,247 @@ def microhud_text(state: dict) -> str:
     ss = uptime % 60
 
     credits = float(state["credits"].credits)
+    stats: RunningStats = state["stats"]
     status = state["status"]
-    shoe = state["last_payload"]["shoe_remaining"] if state.get("last_payload") else None
+    shoe = state.get("shoe_remaining")
     shoe_txt = f"{shoe} cards" if shoe is not None else "—"
 
     return (
         f"LIVE {ui['viewers']:,} viewers · ping {ui['ping']}ms · {ui['fps']}fps · uptime {hh:02d}:{mm:02d}:{ss:02d} "
         f"| bankroll ${state['bankroll']:.2f} · hands {state['hand']:,} · maxDD ${state['max_drawdown']:.2f} "
-        f"| credits {credits:.2f} · shoe {shoe_txt} · {status}"
+        f"· ev/hand {stats.mean:+.4f}±{stats.stderr:.4f} "
+        f"| credits {credits:.2f} · refills {stats.refills} · shoe {shoe_txt} · {status}"
     )
 
 
+# =========================
+# BACKGROUND SIMULATION
+# =========================
+# Sim-owned state keys a snapshot copies; "ui" and "playback" stay with the UI thread.
+SNAPSHOT_KEYS = (
+    "cfg", "rules", "econ", "bankroll", "net_profit", "hand", "peak_bankroll", "max_drawdown",
+    "wins", "pushes", "losses", "bjs", "status", "last_rr", "last_payload", "shoe_remaining",
+    "_cinematic_pause_s", "term_seq",
+)
+
+
+def take_snapshot(state: dict) -> MappingProxyType:
+    # Everything copied here is either immutable or replaced (never mutated) by compute_one_hand.
+    snap = {k: state[k] for k in SNAPSHOT_KEYS}
+    snap["credits"] = copy.copy(state["credits"])
+    snap["stats"] = copy.copy(state["stats"])
+    tail = list(itertools.islice(reversed(state["term"]), TERM_VISIBLE))
+    tail.reverse()
+    snap["term"] = tuple(tail)
+    return MappingProxyType(snap)
+
+
+def snapshot_view(state: dict, snap) -> dict:
+    # Render-ready state: the published sim fields plus this session's UI-owned dicts.
+    view = dict(snap)
+    view["ui"] = state["ui"]
+    view["playback"] = state["playback"]
+    return view
+
+
+class SimWorker:
+    # Runs compute_one_hand on a daemon thread, at full speed or at hands_per_sec, and
+    # publishes an immutable snapshot every publish_every_s. While it runs it owns the
+    # sim keys of `state`; the UI reads only `snapshot` (a plain reference swap, no lock).
+    # It stops on DEAD / hands_cap, on stop(), or when the UI stops calling touch()
+    # (never, with idle_timeout_s=None). With a hub, every hand record and terminal line
+    # is also published there.
+    def __init__(
+        self,
+        state: dict,
+        log_path: Optional[str],
+        hands_per_sec: Optional[float] = None,
+        publish_every_s: float = 0.1,
+        idle_timeout_s: Optional[float] = 30.0,
+        hub: Optional[Hub] = None,
+    ):
+        self.state = state
+        self.log_path = log_path
+        self.hands_per_sec = hands_per_sec
+        self.publish_every_s = float(publish_every_s)
+        self.idle_timeout_s = idle_timeout_s
+        self.hub = hub
+        self._term_seq = state.get("term_seq", 0)
+        self._events_total = state["events"].total
+        self.snapshot = take_snapshot(state)
+        self._stop = threading.Event()
+        self._touched = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="countess-sim", daemon=True)
+
+    def start(self) -> "SimWorker":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def touch(self) -> None:
+        self._touched = time.monotonic()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def _finished(self) -> bool:
+        state = self.state
+        return state["status"] == "DEAD" or state["hand"] >= state["cfg"].hands_cap
+
+    def _run(self) -> None:
+        state = self.state
+        t0 = time.monotonic()
+        done = 0
+        next_publish = t0
+        while not self._stop.is_set() and not self._finished():
+            now = time.monotonic()
+            if self.idle_timeout_s is not None and now - self._touched > self.idle_timeout_s:
+                break
+            if self.hands_per_sec:
+                ahead = t0 + done / self.hands_per_sec - now
+                if ahead > 0:
+                    self._stop.wait(min(ahead, self.publish_every_s))
+                    continue
+            # The hand that is published is traced so the UI can play it back.
+            publish = now >= next_publish
+            compute_one_hand(state, self.log_path, verbose=publish)
+            done += 1
+            if self.hub is not None:
+                self._broadcast()
+            if publish:
+                self.snapshot = take_snapshot(state)
+                next_publish = now + self.publish_every_s
+        self.snapshot = take_snapshot(state)
+
+    def _broadcast(self) -> None:
+        state = self.state
+        term = state["term"]
+        new = min(state["term_seq"] - self._term_seq, len(term))
+        self._term_seq = state["term_seq"]
+        events = state["events"]
+        if events.total != self._events_total:
+            self._events_total = events.total
+            self.hub.publish("hand", events[-1])
+        for i in range(len(term) - new, len(term)):
+            line = term[i]
+            self.hub.publish("term", {"t": line["t"], "tag": line["tag"], "msg": line["msg"], "level": line["level"]})
+
+
+def live_worker() -> Optional[SimWorker]:
+    # COUNTESS_LIVE=<hands/sec>: one shared run per server process, paced for watching,
+    # that every session views read-only. COUNTESS_LIVE_PORT also serves it over SSE
+    # (broadcast.py). The hub keeps the worker across script reruns and sessions.
+    hps = float(os.environ.get("COUNTESS_LIVE", "0") or 0)
+    if hps <= 0:
+        return None
+    hub = live_hub(int(os.environ.get("COUNTESS_LIVE_PORT", "0") or 0))
+    return hub.claim(
+        lambda: SimWorker(init_state(app_run_config(), Rules(), SurvivalEconomy()), None, hps, idle_timeout_s=None, hub=hub).start()
+    )
+
+
+# =========================
+# LIVE VIEW
+# =========================
+class LiveSlot:
+    # st.empty() placeholder that only re-sends its element when the content changed.
+    def __init__(self, placeholder):
+        self._ph = placeholder
+        self._last: Optional[Tuple[str, str]] = None
+
+    def _emit(self, kind: str, body: str) -> None:
+        if self._last == (kind, body):
+            return
+        self._last = (kind, body)
+        if kind == "caption":
+            self._ph.caption(body)
+        else:
+            self._ph.markdown(body, unsafe_allow_html=True)
+
+    def caption(self, text: str) -> None:
+        self._emit("caption", text)
+
+    def html(self, html: str) -> None:
+        self._emit("html", html)
+
+    def component(self, html: str, height: int) -> None:
+        if self._last == ("component", html):
+            return
+        self._last = ("component", html)
+        if hasattr(self._ph, "iframe"):  # newer Streamlit replaces components.v1.html with st.iframe
+            self._ph.iframe(html, height=height)
+        else:
+            with self._ph.container():
+                components.html(html, height=height)
+
+
+def live_window_html(state: dict, reveal: bool, table_panel: Optional[str] = None) -> str:
+    if table_panel is None:
+        table_panel = render_table_html(state, reveal=reveal)
+    inner = f"""
+<div style="display:grid; grid-template-columns: 1.0fr 1.25fr; gap: 12px; height: 100%;">
+  <div style="min-width:0; height:100%; overflow:hidden;">{term_panel_html(state)}</div>
+  <div style="min-width:0; height:100%; overflow:hidden;">{table_panel}</div>
+</div>
+"""
+    return windows_shell_frame(inner, title=f"Windows Terminal — {PROJECT_NAME}")
+
+
+# =========================
+# CLIENT-SIDE PLAYBACK
+# =========================
+CLIENT_VIEW_HEIGHT = 820  # px; the component iframe needs a fixed height
+
+_CLIENT_VIEW_STYLE = """
+<style>
+html, body { margin: 0; overflow: hidden; }
+.win-desktop { min-height: calc(100vh - 2px); }
+</style>
+"""
+
+_CLIENT_PLAYBACK_JS = """
+<script>
+(() => {
+  const frames = %(frames)s;
+  const el = document.getElementById("countess-table");
+  let i = 0;
+  const tick = () => {
+    el.innerHTML = frames[i];
+    if (++i < frames.length) setTimeout(tick, %(interval_ms)d);
+  };
+  tick();
+})();
+</script>
+"""
+
+
+def drain_playback(state: dict, reveal: bool) -> List[str]:
+    # Runs the trace reducer to the end, keeping the table frame shown before each step
+    # (the same frames the server-driven loop would send one by one).
+    frames = []
+    while state["playback"]["active"]:
+        frames.append(render_table_html(state, reveal=reveal))
+        apply_trace_step(state)
+    return frames
+
+
+def client_view_html(state: dict, reveal: bool, frames: Optional[List[str]] = None, steps_per_sec: float = 11.0) -> str:
+    # Self-contained document for the component iframe: stylesheet, window and, when frames
+    # are given, a script that steps through them at steps_per_sec.
+    if not frames:
+        return css_windows_desktop_terminal() + _CLIENT_VIEW_STYLE + live_window_html(state, reveal)
+    panel = f'<div id="countess-table" style="height:100%;">{frames[0]}</div>'
+    script = _CLIENT_PLAYBACK_JS % {
+        "frames": json.dumps(frames).replace("</", "<\\/"),
+        "interval_ms": int(1000.0 / max(1.0, steps_per_sec)),
+    }
+    return css_windows_desktop_terminal() + _CLIENT_VIEW_STYLE + live_window_html(state, reveal, panel) + script
+
+
 # =========================
 # MAIN
 # =========================
@@ -1263,6 +1141,10 @@ def main():
         st.session_state.animate = True
     if "reveal" not in st.session_state:
         st.session_state.reveal = False
+    if "client_playback" not in st.session_state:
+        st.session_state.client_playback = False
+    if "background" not in st.session_state:
+        st.session_state.background = False
     if "steps_per_sec" not in st.session_state:
         st.session_state.steps_per_sec = 11.0
     if "hands_per_sec" not in st.session_state:
@@ -1272,39 +1154,93 @@ def main():
     if "log_path" not in st.session_state:
         st.session_state.log_path = ""
 
+    # Live mode: the process's shared run replaces this session's own simulation.
+    live = live_worker()
     if "state" not in st.session_state:
-        st.session_state.state = init_state(RunConfig(), Rules(), SurvivalEconomy())
+        st.session_state.state = ui_state() if live else init_state(app_run_config(), Rules(), SurvivalEconomy())
 
     state = st.session_state.state
 
-    # jitter always
-    evolve_fake_net(state, intensity=0.7)
-
     # controls strip
     st.markdown("<div class='ctrlwrap'>", unsafe_allow_html=True)
-    c1, c2, c3, c4, c5, c6, c7 = st.columns([1.1, 1.0, 1.0, 1.0, 1.0, 1.2, 2.4])
-    with c1:
-        st.session_state.autoplay = st.toggle("Autoplay", value=st.session_state.autoplay)
+    if live:
+        c2, c3, c4, c9 = st.columns([1.0, 1.0, 1.0, 6.0])
+    else:
+        c1, c2, c3, c4, c5, c6, c7, c8, c9 = st.columns([1.1, 1.0, 1.0, 1.0, 1.0, 1.0, 1.0, 1.2, 2.2])
+        with c1:
+            st.session_state.autoplay = st.toggle("Autoplay", value=st.session_state.autoplay)
     with c2:
         st.session_state.animate = st.toggle("Animate", value=st.session_state.animate)
     with c3:
         st.session_state.reveal = st.toggle("Reveal hole", value=st.session_state.reveal)
     with c4:
-        st.session_state.batch = int(st.number_input("Batch", 1, 5000, int(st.session_state.batch), 10))
-    with c5:
-        deal = st.button("DEAL 1", use_container_width=True, type="primary")
-    with c6:
-        reset = st.button("RESET RUN", use_container_width=True)
-    with c7:
-        st.caption(microhud_text(state))
+        st.session_state.client_playback = st.toggle(
+            "Client playback",
+            value=st.session_state.client_playback,
+            help="Send each hand's frames to the browser once and animate them there.",
+        )
+    deal = reset = False
+    if not live:
+        with c5:
+            st.session_state.background = st.toggle(
+                "Background sim",
+                value=st.session_state.background,
+                help="Autoplay runs the simulation at full speed on a worker thread; the view follows its snapshots.",
+            )
+        with c6:
+            st.session_state.batch = int(st.number_input("Batch", 1, 5000, int(st.session_state.batch), 10))
+        with c7:
+            deal = st.button("DEAL 1", use_container_width=True, type="primary")
+        with c8:
+            reset = st.button("RESET RUN", use_container_width=True)
+    with c9:
+        hud = LiveSlot(st.empty())
     st.markdown("</div>", unsafe_allow_html=True)
 
+    # COUNTESS_REPLAY=<index> (replay.py build) adds a seek into that run.
+    seek = False
+    replay_path = os.environ.get("COUNTESS_REPLAY", "")
+    if replay_path and not live:
+        if st.session_state.get("replay_index_path") != replay_path:
+            st.session_state.replay_index = ReplayIndex.load(replay_path)
+            st.session_state.replay_index_path = replay_path
+        index: ReplayIndex = st.session_state.replay_index
+        r1, r2, _ = st.columns([1.1, 1.0, 7.6])
+        with r1:
+            seek_to = int(st.number_input("Seek hand", 1, max(1, index.hands), 1, 1))
+        with r2:
+            seek = st.button("SEEK", use_container_width=True)
+
+    # A running worker owns the sim state; stop it before anything touches the state inline.
+    # A live viewer only ever reads the shared worker's snapshots.
+    if live:
+        wants_worker, worker = True, live
+    else:
+        wants_worker = st.session_state.autoplay and st.session_state.background and not (deal or reset or seek)
+        worker: Optional[SimWorker] = st.session_state.get("worker")
+        if worker is not None and (not wants_worker or worker.state is not state):
+            worker.stop()
+            worker = st.session_state.worker = None
+
     # reset
     if reset:
-        st.session_state.state = init_state(RunConfig(), Rules(), SurvivalEconomy())
+        flush_event_writers()
+        cfg = app_run_config()
+        if cfg.checkpoint_path:
+            # A reset starts over for good: the next refresh must not resume the old run.
+            flush_checkpoint_writers()
+            Path(cfg.checkpoint_path).unlink(missing_ok=True)
+        st.session_state.state = init_state(cfg, Rules(), SurvivalEconomy(), resume=False)
         st.session_state.autoplay = False
         st.rerun()
 
+    # seek
+    if seek:
+        state = st.session_state.state = seek_state(index, seek_to)
+        st.session_state.autoplay = False
+        if st.session_state.animate:
+            start_playback(state, state["last_rr"], state["last_payload"], reveal_at_end=True)
+
     # deal one
     if deal and state["status"] != "DEAD":
         lp = st.session_state.log_path.strip() or None
@@ -1312,40 +1248,77 @@ def main():
         evolve_fake_net(state, intensity=1.2)
         if st.session_state.animate and state["last_rr"] and state["last_payload"]:
             start_playback(state, state["last_rr"], state["last_payload"], reveal_at_end=True)
-        st.rerun()
-
-    # inner HTML split layout
-    host = state["ui"]["win_host"]
-    tab = state["ui"]["tab"]
-    cwd = state["ui"]["cwd"]
-
-    term_panel = term_html(state["term"], title=host, tab_label=tab, cwd=cwd)
-    table_panel = render_table_html(state, reveal=st.session_state.reveal)
 
-    inner = f"""
-<div style="display:grid; grid-template-columns: 1.0fr 1.25fr; gap: 12px; height: 100%;">
-  <div style="min-width:0; height:100%; overflow:hidden;">{term_panel}</div>
-  <div style="min-width:0; height:100%; overflow:hidden;">{table_panel}</div>
-</div>
-"""
-
-    st.markdown(windows_shell_frame(inner, title=f"Windows Terminal — {PROJECT_NAME}"), unsafe_allow_html=True)
+    # Live loop: the CSS, controls and everything above are sent once per script run;
+    # playback frames and autoplay ticks only update the HUD and window placeholders.
+    # Any widget interaction interrupts the loop with a normal rerun.
+    window = LiveSlot(st.empty())
+    shown_hand = state.get("hand")  # None for a live viewer: play back the current hand on join
+    while True:
+        # jitter always
+        evolve_fake_net(state, intensity=0.7)
+        # buffered logs idle between ticks still reach disk within max_age_s
+        flush_event_writers(stale_only=True)
+
+        view = state
+        if wants_worker:
+            if worker is None and state["status"] != "DEAD":
+                lp = st.session_state.log_path.strip() or None
+                worker = st.session_state.worker = SimWorker(state, lp).start()
+            if worker is not None:
+                worker.touch()
+                view = snapshot_view(state, worker.snapshot)
+                # play back the newest published hand once the previous playback has finished
+                if (
+                    st.session_state.animate
+                    and not state["playback"]["active"]
+                    and view["hand"] != shown_hand
+                    and view["last_rr"]
+                    and view["last_payload"]
+                ):
+                    start_playback(view, view["last_rr"], view["last_payload"], reveal_at_end=True)
+                    shown_hand = view["hand"]
+
+        hud.caption(microhud_text(view))
+        reveal = st.session_state.reveal
+        sps = max(1.0, float(st.session_state.steps_per_sec))
+
+        # client playback: the whole hand goes out in one message and the browser animates it
+        if st.session_state.client_playback:
+            if state["playback"]["active"]:
+                frames = drain_playback(view, reveal)
+                window.component(client_view_html(view, reveal, frames, sps), CLIENT_VIEW_HEIGHT)
+                time.sleep(len(frames) / sps)
+                continue
+            window.component(client_view_html(view, reveal), CLIENT_VIEW_HEIGHT)
+        else:
+            window.html(live_window_html(view, reveal=reveal))
+
+        # animation tick
+        if state["playback"]["active"]:
+            apply_trace_step(view)
+            evolve_fake_net(state, intensity=0.9)
+            time.sleep(1.0 / sps)
+            continue
+
+        # background tick: the worker never waits on this loop
+        if worker is not None:
+            if not worker.is_alive():
+                break
+            time.sleep(1.0 / max(0.5, float(st.session_state.hands_per_sec)))
+            continue
 
-    # animation tick
-    if state["playback"]["active"]:
-        apply_trace_step(state)
-        evolve_fake_net(state, intensity=0.9)
-        time.sleep(1.0 / max(1.0, float(st.session_state.steps_per_sec)))
-        st.rerun()
+        # autoplay tick
+        if not st.session_state.autoplay or state["status"] == "DEAD":
+            break
 
-    # autoplay tick
-    if st.session_state.autoplay and not state["playback"]["active"] and state["status"] != "DEAD":
         lp = st.session_state.log_path.strip() or None
         n = int(st.session_state.batch)
 
         intensity = min(2.0, 0.85 + n / 150.0)
-        for _ in range(n):
-            compute_one_hand(state, lp)
+        for i in range(n):
+            # Only the last hand of the batch is played back, so only it needs a trace.
+            compute_one_hand(state, lp, verbose=(i == n - 1))
             evolve_fake_net(state, intensity=intensity)
             if state["status"] == "DEAD":
                 break
@@ -1358,7 +1331,6 @@ def main():
             time.sleep(pause)
 
         time.sleep(1.0 / max(0.5, float(st.session_state.hands_per_sec)))
-        st.rerun()
 
 
 if __name__ == "__main__":
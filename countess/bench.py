@@ -0,0 +1,375 @@
+# bench.py
+# COUNTESS — benchmarks for the engine, economy and rendering hot paths (simulation only).
+# Each benchmark reports operations per second (hands, calls, steps or renders). A pure-Python
+# calibration loop runs alongside, and every result is also stored relative to it, so
+# a baseline recorded on one machine stays comparable on another (CI runners included).
+# Runs append to a JSONL history; --check compares against the baseline and exits 1 when a
+# benchmark is slower by more than the threshold. --rounds N keeps each benchmark's median
+# over N passes, and --gate limits which benchmarks can fail the check (the rest are still
+# reported), so CI can gate the macro benchmarks without tripping on micro-benchmark noise.
+#
+# Run:
+#   python bench.py
+#   python bench.py --quick --check --threshold 0.35
+#   python bench.py --quick --rounds 5 --check --gate engine. --gate app.compute_one_hand
+#   python bench.py --save-baseline
+#   python bench.py --only engine.
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import dataclasses
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app import compute_one_hand, init_state, table_html, term_html, term_row_html, windows_shell_frame
+from engine import (
+    BlackjackEnv,
+    CreditManager,
+    Rules,
+    RunConfig,
+    SurvivalEconomy,
+    basic_strategy,
+    flush_event_writers,
+    hand_value,
+    make_shoe_cards,
+)
+
+BENCH_DIR = Path(__file__).resolve().parent / "benchmarks"
+HISTORY_PATH = BENCH_DIR / "history.jsonl"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+DEFAULT_THRESHOLD = 0.25  # fractional slowdown (relative to calibration) that fails --check
+
+RULE_VARIANTS = {
+    "s17": Rules(),
+    "h17": Rules(dealer_stands_soft_17=False),
+    "8d_nodas": Rules(decks=8, double_after_split=False),
+    "rsa": Rules(allow_resplit_aces=True),
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Bench:
+    name: str
+    # setup(scale) returns (fn, ops): one call of fn performs `ops` operations.
+    setup: Callable[..., Tuple[Callable[[], object], int]]
+    # With tmp, setup(scale, tmp) also gets a scratch directory, removed after the benchmark.
+    tmp: bool = False
+
+
+def _time(fn: Callable[[], object], ops: int, repeat: int) -> float:
+    # Best of `repeat` runs, in operations per second.
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return ops / max(best, 1e-9)
+
+
+# =========================
+# BENCHMARKS
+# =========================
+def _calibration(scale: float):
+    n = int(200_000 * scale)
+
+    def fn():
+        acc = 0
+        d = {}
+        for i in range(n):
+            acc += i & 7
+            d[i & 63] = acc
+        return acc
+
+    return fn, n
+
+
+def _engine_verbose(rules: Rules):
+    def setup(scale: float):
+        n = int(5_000 * scale)
+        env = BlackjackEnv(rules, np.random.default_rng(1))
+
+        def fn():
+            for _ in range(n):
+                env.play_round_verbose(1.0)
+
+        return fn, n
+
+    return setup
+
+
+def _engine_headless(scale: float):
+    n = int(20_000 * scale)
+    env = BlackjackEnv(Rules(), np.random.default_rng(1))
+
+    def fn():
+        for _ in range(n):
+            env.play_round(1.0)
+
+    return fn, n
+
+
+def _sample_hands(n: int) -> List[Tuple[list, tuple]]:
+    # Random 2-4 card player hands with a dealer upcard, drawn from a real shoe.
+    rng = np.random.default_rng(3)
+    cards = make_shoe_cards(1)
+    out = []
+    for _ in range(n):
+        idx = rng.choice(len(cards), size=int(rng.integers(3, 6)), replace=False)
+        picked = [cards[i] for i in idx]
+        out.append((picked[1:], picked[0]))
+    return out
+
+
+def _hand_value(scale: float):
+    hands = [h for h, _ in _sample_hands(1000)]
+    reps = max(1, int(50 * scale))
+
+    def fn():
+        for _ in range(reps):
+            for h in hands:
+                hand_value(h)
+
+    return fn, reps * len(hands)
+
+
+def _basic_strategy(scale: float):
+    hands = _sample_hands(1000)
+    reps = max(1, int(20 * scale))
+
+    def fn():
+        for _ in range(reps):
+            for h, up in hands:
+                basic_strategy(h, up)
+
+    return fn, reps * len(hands)
+
+
+def _credit_step(scale: float):
+    n = int(200_000 * scale)
+    profits = np.random.default_rng(5).choice([-2.0, -1.0, 0.0, 1.0, 1.5, 2.0], size=n).tolist()
+    econ = SurvivalEconomy(initial_credits=1e9, death_threshold=-1e18)
+
+    def fn():
+        cm = CreditManager(econ)
+        for p in profits:
+            cm.step(p)
+
+    return fn, n
+
+
+def _compute_one_hand(log: bool):
+    def setup(scale: float, tmp: str):
+        n = int(2_000 * scale)
+        econ = SurvivalEconomy(initial_credits=1e9, burn_per_hand=0.0, death_threshold=-1e18)
+        cfg = RunConfig(hands_cap=10 ** 12, initial_bankroll=1e12)
+        state = init_state(cfg, Rules(), econ)
+        log_path = os.path.join(tmp, "bench.jsonl") if log else None
+
+        def fn():
+            # Each run starts an empty log, so repeats time the same appends.
+            if log_path and os.path.exists(log_path):
+                os.remove(log_path)
+            for _ in range(n):
+                compute_one_hand(state, log_path)
+            if log_path:
+                flush_event_writers()
+
+        return fn, n
+
+    return setup
+
+
+def _term_lines(n: int) -> List[dict]:
+    lines = []
+    for i in range(n):
+        msg = f"#{i:>6} outcome=WIN pnl=+1.00 bankroll={500 + i:.2f}"
+        lines.append({"t": "12:00:00", "tag": "HAND", "msg": msg, "level": "ok",
+                      "html": term_row_html("12:00:00", "HAND", msg, "ok")})
+    return lines
+
+
+def _term_html(scale: float):
+    lines = _term_lines(600)
+    n = int(2_000 * scale)
+
+    def fn():
+        for _ in range(n):
+            term_html(lines, title="DESKTOP-BENCH")
+
+    return fn, n
+
+
+def _table_html(scale: float):
+    # Cycles through dealt hands so the fragment caches see a realistic mix.
+    hands = _sample_hands(256)
+    labels = [([f"{c[0]}{c[1]}" for c in h], f"{up[0]}{up[1]}") for h, up in hands]
+    n = int(5_000 * scale)
+
+    def fn():
+        for i in range(n):
+            player, up = labels[i % len(labels)]
+            table_html([up, "🂠"], [player], True, 1.0, "—", 0.0)
+
+    return fn, n
+
+
+def _shell_frame(scale: float):
+    inner = term_html(_term_lines(80), title="DESKTOP-BENCH")
+    n = int(5_000 * scale)
+
+    def fn():
+        for _ in range(n):
+            windows_shell_frame(inner, title="Windows Terminal — BENCH")
+
+    return fn, n
+
+
+CALIBRATION = "calibration"
+BENCHES = (
+    *(Bench(f"engine.verbose.{k}", _engine_verbose(r)) for k, r in RULE_VARIANTS.items()),
+    Bench("engine.headless.s17", _engine_headless),
+    Bench("strategy.hand_value", _hand_value),
+    Bench("strategy.basic_strategy", _basic_strategy),
+    Bench("economy.credit_step", _credit_step),
+    Bench("app.compute_one_hand", _compute_one_hand(log=False), tmp=True),
+    Bench("app.compute_one_hand.jsonl", _compute_one_hand(log=True), tmp=True),
+    Bench("render.term_html", _term_html),
+    Bench("render.table_html", _table_html),
+    Bench("render.windows_shell_frame", _shell_frame),
+)
+
+
+def run_benches(only: Sequence[str] = (), scale: float = 1.0, repeat: int = 3) -> Dict[str, float]:
+    # ops/sec per benchmark. The calibration loop is timed after every benchmark and the
+    # median is kept, so neither a slow nor a boosted patch of the machine skews the ratios.
+    results: Dict[str, float] = {}
+    calib_fn, calib_ops = _calibration(scale)
+    calib = [_time(calib_fn, calib_ops, repeat)]
+    for b in BENCHES:
+        if only and not any(b.name.startswith(p) for p in only):
+            continue
+        with contextlib.ExitStack() as stack:
+            args = (stack.enter_context(tempfile.TemporaryDirectory(prefix="countess-bench-")),) if b.tmp else ()
+            fn, ops = b.setup(scale, *args)
+            fn()  # warm caches and lazy imports
+            results[b.name] = _time(fn, ops, repeat)
+        calib.append(_time(calib_fn, calib_ops, 2))
+    results[CALIBRATION] = float(np.median(calib))
+    return results
+
+
+# =========================
+# HISTORY / BASELINE
+# =========================
+def median_results(runs: Sequence[Dict[str, float]]) -> Dict[str, float]:
+    # Per-benchmark median over several run_benches passes.
+    return {k: float(np.median([r[k] for r in runs])) for k in runs[0]}
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=Path(__file__).resolve().parent, timeout=10)
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def make_record(results: Dict[str, float], scale: float = 1.0) -> dict:
+    calib = results[CALIBRATION]
+    return {
+        "scale": scale,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "ops_per_sec": results,
+        "relative": {k: v / calib for k, v in results.items() if k != CALIBRATION},
+    }
+
+
+def append_history(path: Path, record: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def compare(record: dict, baseline: dict, threshold: float) -> List[dict]:
+    # One row per benchmark present in both; `change` is the relative speed change
+    # (negative = slower) and `regressed` marks slowdowns beyond the threshold.
+    rows = []
+    if baseline.get("scale", 1.0) != record.get("scale", 1.0):
+        return rows  # different workloads are not comparable
+    for name, now in record["relative"].items():
+        base = baseline.get("relative", {}).get(name)
+        if not base:
+            continue
+        change = now / base - 1.0
+        rows.append({"bench": name, "change": change, "regressed": change < -threshold})
+    return rows
+
+
+def _format(record: dict, rows: Sequence[dict]) -> str:
+    changes = {r["bench"]: r for r in rows}
+    lines = [f"{'bench':<30} {'ops/sec':>14} {'vs baseline':>12}"]
+    for name, ops in record["ops_per_sec"].items():
+        r = changes.get(name)
+        delta = "" if r is None else f"{r['change']:+.1%}" + (" !" if r["regressed"] else "")
+        lines.append(f"{name:<30} {ops:>14,.0f} {delta:>12}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="COUNTESS hot-path benchmarks (simulation only)")
+    ap.add_argument("--only", action="append", default=[], metavar="PREFIX", help="run benchmarks with this name prefix")
+    ap.add_argument("--quick", action="store_true", help="fewer timed runs (CI); workloads stay comparable")
+    ap.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark (best is kept)")
+    ap.add_argument("--scale", type=float, default=1.0, help="workload multiplier (keep equal to the baseline's)")
+    ap.add_argument("--history", default=str(HISTORY_PATH), help="JSONL file each run is appended to ('' = none)")
+    ap.add_argument("--baseline", default=str(BASELINE_PATH))
+    ap.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    ap.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed fractional slowdown")
+    ap.add_argument("--check", action="store_true", help="exit 1 if any benchmark regressed")
+    ap.add_argument("--gate", action="append", default=[], metavar="PREFIX",
+                    help="only benchmarks with this name prefix fail --check (default: all)")
+    ap.add_argument("--rounds", type=int, default=1, help="full passes; each benchmark keeps its median")
+    args = ap.parse_args(argv)
+
+    repeat = 2 if args.quick else args.repeat
+    results = median_results([run_benches(args.only, scale=args.scale, repeat=repeat) for _ in range(max(1, args.rounds))])
+    record = make_record(results, args.scale)
+    if args.history:
+        append_history(Path(args.history), record)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    rows = compare(record, baseline, args.threshold)
+    print(_format(record, rows))
+    if not baseline:
+        print(f"\nno baseline at {baseline_path}; nothing to compare")
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(record, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nbaseline -> {baseline_path}")
+
+    regressed = [r["bench"] for r in rows if r["regressed"]]
+    if regressed:
+        print(f"\n{len(regressed)} regressed beyond {args.threshold:.0%}: " + ", ".join(regressed))
+    gated = [b for b in regressed if not args.gate or any(b.startswith(p) for p in args.gate)]
+    return 1 if args.check and gated else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
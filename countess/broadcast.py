@@ -0,0 +1,270 @@
+# broadcast.py
+# COUNTESS — one live run, many read-only viewers (simulation only).
+# A Hub is an in-process pub/sub ring: the run's single publisher appends each hand record
+# and terminal line once, already encoded as a server-sent-events frame, and every subscriber
+# reads forward from its own cursor. Publishing costs the same for one viewer or a thousand;
+# a subscriber that falls further behind than the ring skips ahead (the seq gap shows it).
+# serve_sse() exposes a hub over plain HTTP (http.server, no extra dependency):
+#   GET /events   text/event-stream (id = seq, event = kind, data = JSON); resumes after
+#                 Last-Event-ID or ?since=N, otherwise (or when N is past the end of the stream)
+#                 starts with the latest message of each kind
+#   GET /latest   JSON object with the latest message of each kind
+#
+# Run:
+#   python broadcast.py serve --seed 7 --hps 5 --port 8765
+#   python broadcast.py watch http://127.0.0.1:8765/events
+#   curl -N http://127.0.0.1:8765/events
+
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import urllib.request
+from collections import deque
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+from engine import Rules, RunConfig, SurvivalEconomy, new_sim_state, play_hand
+
+DEFAULT_PORT = 8765
+KEEPALIVE_S = 15.0
+
+
+@dataclass(frozen=True)
+class Message:
+    seq: int
+    kind: str
+    data: str  # JSON
+    frame: bytes  # the same message as an SSE frame
+
+
+class Hub:
+    def __init__(self, history: int = 4096):
+        self._buf: Deque[Message] = deque(maxlen=max(1, int(history)))
+        self._latest: Dict[str, Message] = {}
+        self._cond = threading.Condition()
+        self.seq = 0
+        self.closed = False
+        self.publisher = None
+
+    def claim(self, factory: Callable[[], object]):
+        # The hub's one publisher: the first caller creates it, everyone else gets that one.
+        with self._cond:
+            if self.publisher is None:
+                self.publisher = factory()
+            return self.publisher
+
+    def publish(self, kind: str, data: dict) -> int:
+        body = json.dumps(data, separators=(",", ":"))
+        with self._cond:
+            self.seq += 1
+            frame = f"id: {self.seq}\nevent: {kind}\ndata: {body}\n\n".encode("utf-8")
+            msg = Message(self.seq, kind, body, frame)
+            self._buf.append(msg)
+            self._latest[kind] = msg
+            self._cond.notify_all()
+            return self.seq
+
+    def read(self, cursor: int, timeout: Optional[float] = None) -> List[Message]:
+        # Messages after seq `cursor`, waiting up to timeout for the first one.
+        with self._cond:
+            if self.seq <= cursor and not self.closed:
+                self._cond.wait_for(lambda: self.seq > cursor or self.closed, timeout)
+            k = min(self.seq - cursor, len(self._buf))
+            n = len(self._buf)
+            return [self._buf[i] for i in range(n - k, n)] if k > 0 else []
+
+    def latest(self) -> List[Message]:
+        with self._cond:
+            return sorted(self._latest.values(), key=lambda m: m.seq)
+
+    def close(self) -> None:
+        # Wakes every reader; SSE streams end once they have sent what is buffered.
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+# One hub per process, shared by every session (Streamlit reruns the app script, so it
+# cannot live in app.py).
+_HUB: Optional[Hub] = None
+_HUB_SERVER: Optional[ThreadingHTTPServer] = None
+_HUB_LOCK = threading.Lock()
+
+
+def live_hub(port: int = 0, host: str = "127.0.0.1") -> Hub:
+    # The process-wide hub; with a port, the first call also starts its SSE server.
+    global _HUB, _HUB_SERVER
+    if _HUB is None:
+        with _HUB_LOCK:
+            if _HUB is None:
+                hub = Hub()
+                if port:
+                    _HUB_SERVER = serve_sse(hub, host, port)
+                _HUB = hub
+    return _HUB
+
+
+# =========================
+# SSE
+# =========================
+class _SSEHandler(BaseHTTPRequestHandler):
+    server: "_SSEServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):  # noqa: A002 - quiet; viewers come and go
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/events":
+            self._events(parse_qs(url.query))
+        elif url.path == "/latest":
+            body = json.dumps({m.kind: json.loads(m.data) for m in self.server.hub.latest()}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Access-Control-Allow-Origin", "*")
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_error(404)
+
+    def _events(self, query: Dict[str, List[str]]) -> None:
+        hub = self.server.hub
+        since = self.headers.get("Last-Event-ID") or (query.get("since") or [""])[0]
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            # A cursor past the end (Last-Event-ID from an earlier server process, or ?since=
+            # beyond the stream) starts over like a fresh connect.
+            if since.isdigit() and int(since) <= hub.seq:
+                cursor = int(since)
+            else:
+                backlog = hub.latest()
+                cursor = backlog[-1].seq if backlog else hub.seq
+                self.wfile.write(b"".join(m.frame for m in backlog))
+                self.wfile.flush()
+            while True:
+                msgs = hub.read(cursor, timeout=KEEPALIVE_S)
+                if msgs:
+                    self.wfile.write(b"".join(m.frame for m in msgs))
+                    cursor = msgs[-1].seq
+                elif hub.closed:
+                    return
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+
+
+class _SSEServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, hub: Hub):
+        self.hub = hub
+        super().__init__(addr, _SSEHandler)
+
+
+def serve_sse(hub: Hub, host: str = "127.0.0.1", port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    # Serves the hub on a daemon thread (one thread per connected viewer); returns the server.
+    server = _SSEServer((host, port), hub)
+    threading.Thread(target=server.serve_forever, name="countess-sse", daemon=True).start()
+    return server
+
+
+# =========================
+# HEADLESS PUBLISHER
+# =========================
+def publish_run(
+    hub: Hub,
+    cfg: RunConfig,
+    rules: Rules,
+    econ: SurvivalEconomy,
+    hands_per_sec: Optional[float] = None,
+    stop: Optional[threading.Event] = None,
+) -> dict:
+    # Plays one run without the UI, publishing every hand record ("hand") and a final
+    # "status"; hands_per_sec paces it for live viewing. Returns the final sim state.
+    stop = stop or threading.Event()
+    state = new_sim_state(cfg, rules, econ)
+    t0 = time.monotonic()
+    while not stop.is_set():
+        if hands_per_sec:
+            ahead = t0 + state["hand"] / hands_per_sec - time.monotonic()
+            if ahead > 0:
+                stop.wait(ahead)
+                continue
+        step = play_hand(state)
+        if step is None:
+            break
+        hub.publish("hand", step[2])
+    hub.publish("status", {"status": state["status"], "hand": state["hand"], "bankroll": state["bankroll"]})
+    return state
+
+
+def watch(url: str, kinds: Sequence[str] = ()) -> None:
+    # Minimal SSE client: one line per message.
+    with urllib.request.urlopen(url) as resp:
+        kind, data, seq = "message", "", ""
+        for raw in resp:
+            line = raw.decode("utf-8").rstrip("\n")
+            if line.startswith("id: "):
+                seq = line[4:]
+            elif line.startswith("event: "):
+                kind = line[7:]
+            elif line.startswith("data: "):
+                data = line[6:]
+            elif not line and data:
+                if not kinds or kind in kinds:
+                    print(f"{seq:>8} {kind:<6} {data}", flush=True)
+                kind, data = "message", ""
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="COUNTESS live broadcast: one run, many SSE viewers (simulation only)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="play one run headless and publish it over SSE")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=DEFAULT_PORT)
+    s.add_argument("--hps", type=float, default=5.0, help="hands per second (0 = full speed)")
+    s.add_argument("--seed", type=int, default=RunConfig.seed)
+    s.add_argument("--hands", type=int, default=RunConfig.hands_cap, help="hands_cap")
+    s.add_argument("--linger", type=float, default=60.0, help="seconds to keep serving after the run ends")
+    w = sub.add_parser("watch", help="print an SSE stream")
+    w.add_argument("url", nargs="?", default=f"http://127.0.0.1:{DEFAULT_PORT}/events")
+    w.add_argument("--kind", action="append", default=[], help="only these event kinds (repeatable)")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "watch":
+        try:
+            watch(args.url, args.kind)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    hub = Hub()
+    server = serve_sse(hub, args.host, args.port)
+    print(f"streaming on http://{args.host}:{server.server_address[1]}/events", flush=True)
+    try:
+        state = publish_run(hub, RunConfig(seed=args.seed, hands_cap=args.hands), Rules(), SurvivalEconomy(), args.hps or None)
+        print(f"{state['status']} after {state['hand']:,} hands · bankroll {state['bankroll']:.2f}", flush=True)
+        time.sleep(args.linger)
+    except KeyboardInterrupt:
+        pass
+    hub.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
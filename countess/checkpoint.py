@@ -0,0 +1,207 @@
+# checkpoint.py
+# COUNTESS — periodic snapshots of a running simulation and bit-exact resume (simulation only).
+# A checkpoint holds everything the next hand depends on: the bit-generator state, the shoe
+# order with its deal index and running count, bankroll / peak / drawdown, outcome counters,
+# credits and the streaming stats. capture() copies that on the sim thread (a few hundred
+# bytes); a background writer encodes it as JSON and replaces the file atomically, so a crash
+# leaves either the previous checkpoint or the new one, never a torn file.
+#
+# The terminal history and the in-memory event window are not part of it; the run log keeps
+# the full record stream.
+
+from __future__ import annotations
+
+import atexit
+import base64
+import dataclasses
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+from engine import CARD_TUPLES, ArrayShoe, RunConfig, Rules, RunningStats, SurvivalEconomy
+
+CHECKPOINT_VERSION = 1
+
+# Scalar state-dict keys restored as they are.
+STATE_FIELDS = (
+    "bankroll",
+    "net_profit",
+    "hand",
+    "peak_bankroll",
+    "max_drawdown",
+    "wins",
+    "pushes",
+    "losses",
+    "bjs",
+    "status",
+)
+# RunConfig fields that must match for a checkpoint to continue the same run; hands_cap and
+# the checkpoint settings may change between sessions.
+RUN_FIELDS = ("seed", "base_bet", "initial_bankroll", "strategy_path", "shoe", "count_system", "bet_policy", "deviations")
+
+_CARD_CODES = {c: i for i, c in enumerate(CARD_TUPLES)}
+
+
+def _shoe_codes(shoe) -> bytes:
+    if isinstance(shoe, ArrayShoe):
+        return shoe.cards.tobytes()
+    return bytes(_CARD_CODES[c] for c in shoe.cards)
+
+
+def capture(state: dict) -> dict:
+    # Plain-data copy of the simulation part of an app state dict; call it on the thread
+    # that runs compute_one_hand.
+    cfg: RunConfig = state["cfg"]
+    env = state["env"]
+    shoe = env.shoe
+    stats: RunningStats = state["stats"]
+    return {
+        "version": CHECKPOINT_VERSION,
+        "time": time.time(),
+        "cfg": {k: getattr(cfg, k) for k in RUN_FIELDS},
+        "rules": dataclasses.asdict(state["rules"]),
+        "econ": dataclasses.asdict(state["econ"]),
+        "rng": state["rng"].bit_generator.state,
+        "shoe": {"cards": _shoe_codes(shoe), "i": shoe.i, "running": shoe.running},
+        "state": {k: state[k] for k in STATE_FIELDS},
+        "credits": float(state["credits"].credits),
+        "stats": {k: getattr(stats, k) for k in RunningStats.__slots__},
+    }
+
+
+def check_compatible(snap: dict, cfg: RunConfig, rules: Rules, econ: SurvivalEconomy) -> None:
+    if snap.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"checkpoint version {snap.get('version')!r} is not {CHECKPOINT_VERSION}")
+    if snap["rules"] != dataclasses.asdict(rules):
+        raise ValueError("checkpoint was taken with different Rules")
+    if snap["econ"] != dataclasses.asdict(econ):
+        raise ValueError("checkpoint was taken with a different SurvivalEconomy")
+    diff = [k for k in RUN_FIELDS if snap["cfg"].get(k) != getattr(cfg, k)]
+    if diff:
+        raise ValueError(f"checkpoint RunConfig differs in: {', '.join(diff)}")
+
+
+def restore(state: dict, snap: dict) -> None:
+    # Applies a checkpoint to a state freshly built by init_state with the same config.
+    check_compatible(snap, state["cfg"], state["rules"], state["econ"])
+    shoe = state["env"].shoe
+    codes = snap["shoe"]["cards"]
+    if len(shoe.cards) != len(codes):
+        raise ValueError("checkpoint shoe size does not match the rules")
+    if isinstance(shoe, ArrayShoe):
+        shoe.cards[:] = np.frombuffer(codes, dtype=np.int8)
+    else:
+        shoe.cards = [CARD_TUPLES[c] for c in codes]
+    shoe.i = int(snap["shoe"]["i"])
+    shoe.running = int(snap["shoe"]["running"])
+    state["rng"].bit_generator.state = snap["rng"]
+    state.update(snap["state"])
+    state["credits"].credits = float(snap["credits"])
+    stats: RunningStats = state["stats"]
+    for k, v in snap["stats"].items():
+        setattr(stats, k, v)
+
+
+# =========================
+# FILES
+# =========================
+def encode(snap: dict) -> bytes:
+    data = dict(snap)
+    data["shoe"] = dict(snap["shoe"], cards=base64.b64encode(snap["shoe"]["cards"]).decode("ascii"))
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def decode(raw: bytes) -> dict:
+    snap = json.loads(raw)
+    snap["shoe"]["cards"] = base64.b64decode(snap["shoe"]["cards"])
+    return snap
+
+
+def write_checkpoint(path: str, snap: dict) -> None:
+    # Temp file in the same directory, fsync, then os.replace (atomic on POSIX and Windows).
+    p = Path(path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    tmp = p.with_name(f"{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(encode(snap))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, p)
+
+
+def read_checkpoint(path: str) -> Optional[dict]:
+    p = Path(path)
+    if not p.exists():
+        return None
+    return decode(p.read_bytes())
+
+
+class CheckpointWriter:
+    # Background writer for one path. submit() only stores the snapshot; the thread writes the
+    # newest one, so a slow disk drops intermediate checkpoints instead of stalling the sim.
+    def __init__(self, path: str):
+        self.path = path
+        self._pending: Optional[dict] = None
+        self._cond = threading.Condition()
+        self._busy = False
+        self.written = 0
+        self.error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="countess-checkpoint", daemon=True)
+        self._thread.start()
+
+    def submit(self, snap: dict) -> None:
+        with self._cond:
+            self._pending = snap
+            self._cond.notify()
+
+    def flush(self, timeout: float = 10.0) -> None:
+        # Waits until the latest submitted snapshot is on disk.
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while (self._pending is not None or self._busy) and time.monotonic() < deadline:
+                self._cond.wait(0.05)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                snap, self._pending = self._pending, None
+                self._busy = True
+            try:
+                write_checkpoint(self.path, snap)
+                self.written += 1
+            except OSError as e:
+                self.error = e
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+# One writer per checkpoint path, shared by every session in the process.
+_CHECKPOINT_WRITERS: Dict[str, CheckpointWriter] = {}
+_CHECKPOINT_WRITERS_LOCK = threading.Lock()
+
+
+def checkpoint_writer(path: str) -> CheckpointWriter:
+    w = _CHECKPOINT_WRITERS.get(path)
+    if w is None:
+        with _CHECKPOINT_WRITERS_LOCK:
+            w = _CHECKPOINT_WRITERS.get(path)
+            if w is None:
+                w = _CHECKPOINT_WRITERS[path] = CheckpointWriter(path)
+    return w
+
+
+def flush_checkpoint_writers() -> None:
+    for w in list(_CHECKPOINT_WRITERS.values()):
+        w.flush()
+
+
+atexit.register(flush_checkpoint_writers)
@@ -0,0 +1,103 @@
+# cli.py
+# COUNTESS — headless command-line runner (simulation only).
+# Plays one survival run at full engine speed through the trace-free BlackjackEnv.play_round,
+# with the same per-hand records as the app (JSONL, .jsonl.gz or a .cols run log). Imports
+# engine.py only, so it starts without Streamlit and runs in any plain worker.
+#
+# Run (from the repository root, or `python cli.py run ...` inside countess/):
+#   python -m countess run --seed 7 --hands 500000
+#   python -m countess run --seed 7 --hands 100000 --log logs/run.cols --bet-policy 1-8 --deviations i18
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import time
+from typing import Optional, Sequence, Tuple
+
+from engine import (
+    BET_POLICIES,
+    DEVIATION_SETS,
+    SHOE_TYPES,
+    Rules,
+    RunConfig,
+    RunningStats,
+    SurvivalEconomy,
+    event_writer,
+    new_sim_state,
+    play_run,
+)
+
+
+def run(cfg: RunConfig, rules: Rules, econ: SurvivalEconomy, log_path: Optional[str] = None) -> dict:
+    # One run from cfg.seed until DEAD, BROKE or cfg.hands_cap; returns a summary dict.
+    state = new_sim_state(cfg, rules, econ)
+    writer = event_writer(log_path)
+    status = play_run(state, None if writer is None else lambda step: writer.write(step[2]))
+    if writer is not None:
+        writer.flush()
+    stats: RunningStats = state["stats"]
+    return {
+        "seed": cfg.seed,
+        "status": status,
+        "hands": state["hand"],
+        "final_bankroll": state["bankroll"],
+        "max_drawdown": state["max_drawdown"],
+        "final_credits": float(state["credits"].credits),
+        "refills": stats.refills,
+        "ev_hand": stats.mean,
+        "ev_se": stats.stderr,
+    }
+
+
+def add_run_arguments(p: argparse.ArgumentParser) -> None:
+    # The options that define a run; replay.py uses them too, so an index is built from the
+    # same flags as the run it indexes.
+    p.add_argument("--seed", type=int, default=RunConfig.seed)
+    p.add_argument("--hands", type=int, default=RunConfig.hands_cap, help="hands_cap")
+    p.add_argument("--bet", type=float, default=RunConfig.base_bet)
+    p.add_argument("--bankroll", type=float, default=RunConfig.initial_bankroll)
+    p.add_argument("--shoe", choices=sorted(SHOE_TYPES), default=RunConfig.shoe)
+    p.add_argument("--strategy", default="", help="chart file, or 'optimal'")
+    p.add_argument("--bet-policy", choices=sorted(BET_POLICIES), default=RunConfig.bet_policy)
+    p.add_argument("--deviations", choices=sorted(DEVIATION_SETS), default=None)
+    p.add_argument("--decks", type=int, default=Rules.decks)
+    p.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    p.add_argument("--burn", type=float, default=SurvivalEconomy.burn_per_hand, help="burn_per_hand")
+
+
+def run_setup(args: argparse.Namespace) -> Tuple[RunConfig, Rules, SurvivalEconomy]:
+    cfg = RunConfig(
+        seed=args.seed,
+        hands_cap=args.hands,
+        base_bet=args.bet,
+        initial_bankroll=args.bankroll,
+        strategy_path=args.strategy,
+        shoe=args.shoe,
+        bet_policy=args.bet_policy,
+        deviations=args.deviations or "",
+    )
+    rules = Rules(decks=args.decks, dealer_stands_soft_17=not args.h17)
+    econ = dataclasses.replace(SurvivalEconomy(), burn_per_hand=args.burn)
+    return cfg, rules, econ
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(prog="countess", description="COUNTESS headless runner (simulation only)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="play one survival run without the UI")
+    r.add_argument("--log", default="", help="event log path (.jsonl, .jsonl.gz or .cols)")
+    add_run_arguments(r)
+    args = ap.parse_args(argv)
+
+    cfg, rules, econ = run_setup(args)
+    t0 = time.perf_counter()
+    summary = run(cfg, rules, econ, args.log or None)
+    dt = time.perf_counter() - t0
+    for k, v in summary.items():
+        print(f"{k:<15} {v:.6g}" if isinstance(v, float) else f"{k:<15} {v}")
+    print(f"{summary['hands']:,} hands · {dt:.2f}s · {summary['hands'] / max(dt, 1e-9):,.0f} hands/sec")
+
+
+if __name__ == "__main__":
+    main()
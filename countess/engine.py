@@ -0,0 +1,1116 @@
+# engine.py
+# COUNTESS — blackjack engine and survival economy (simulation only, no Streamlit).
+# Rules / economy config, shoes with running counts, hand and strategy helpers, the
+# StrategyTable chart, bet ramps and deviations, BlackjackEnv, CreditManager, the buffered
+# event writers and RunningStats. app.py is the UI on top of this module; headless tools
+# (farm, vecsim, survival, tournament, `python -m countess run`) import it directly.
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import gzip
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from runlog import ColumnarLog
+
+
+# =========================
+# CONFIG
+# =========================
+@dataclass(frozen=True)
+class Rules:
+    decks: int = 6
+    dealer_stands_soft_17: bool = True  # S17
+    double_after_split: bool = True     # DAS
+    allow_resplit_aces: bool = False
+    max_splits: int = 3
+    blackjack_payout: float = 1.5       # 3:2
+    penetration: float = 0.75           # reshuffle when remaining < (1-penetration)
+
+
+@dataclass
+class SurvivalEconomy:
+    initial_credits: float = 50.0
+    burn_per_hand: float = 0.0005
+    tax_rate_on_positive_profit: float = 0.20
+    refill_threshold: float = 5.0
+    refill_amount: float = 20.0
+    death_threshold: float = 0.0
+
+
+@dataclass
+class RunConfig:
+    seed: int = 7
+    hands_cap: int = 500_000
+    base_bet: float = 1.0
+    initial_bankroll: float = 500.0
+    strategy_path: str = ""  # optional chart file (see strategies/), "optimal" = computed per Rules; empty = built-in
+    shoe: str = "list"  # "list" (tuple cards) or "array" (int8 card codes, ArrayShoe)
+    count_system: str = "hilo"  # key of COUNT_SYSTEMS kept by the shoe
+    bet_policy: str = "flat"  # key of BET_POLICIES; bets scale base_bet by the true count
+    deviations: str = ""  # key of DEVIATION_SETS ("i18"); empty = chart only
+    checkpoint_path: str = ""  # snapshot file (checkpoint.py); init_state resumes from it
+    checkpoint_every: int = 5000  # hands between snapshots; 0 = off
+
+
+# =========================
+# CARDS / SHOE
+# =========================
+SUITS = ["♠", "♥", "♦", "♣"]
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+
+
+def rank_value(rank: str) -> int:
+    if rank == "A":
+        return 1
+    if rank in ["J", "Q", "K"]:
+        return 10
+    return int(rank)
+
+
+def make_shoe_cards(decks: int) -> List[Tuple[str, str, int]]:
+    cards = []
+    for _ in range(decks):
+        for suit in SUITS:
+            for rank in RANKS:
+                cards.append((rank, suit, rank_value(rank)))
+    return cards
+
+
+# Card-counting tags indexed by card value (A=1, ten-valued=10); index 0 is unused.
+# All are balanced, so a full shoe counts to zero.
+COUNT_SYSTEMS = {
+    "hilo": (0, -1, 1, 1, 1, 1, 1, 0, 0, 0, -1),
+    "hiopt1": (0, 0, 0, 1, 1, 1, 1, 0, 0, 0, -1),
+    "zen": (0, -1, 1, 1, 2, 2, 2, 1, 0, 0, -2),
+}
+# True counts divide by at least half a deck so the last cards cannot blow them up.
+MIN_DECKS_REMAINING = 0.5
+
+
+class Shoe:
+    # `running` is the count of every card dealt since the shuffle, updated in deal().
+    def __init__(self, decks: int, rng: np.random.Generator, count_system: str = "hilo"):
+        self.decks = decks
+        self.rng = rng
+        self.tags = COUNT_SYSTEMS[count_system]
+        self.cards = make_shoe_cards(decks)
+        self.shuffle()
+
+    def shuffle(self) -> None:
+        self.rng.shuffle(self.cards)
+        self.i = 0
+        self.running = 0
+
+    def remaining(self) -> int:
+        return len(self.cards) - self.i
+
+    def deal(self) -> Tuple[str, str, int]:
+        c = self.cards[self.i]
+        self.i += 1
+        self.running += self.tags[c[2]]
+        return c
+
+    def true_count(self, hidden: int = 0) -> float:
+        # `hidden` is the count of dealt cards the player has not seen (the hole card).
+        return (self.running - hidden) / max(self.remaining() / 52.0, MIN_DECKS_REMAINING)
+
+    def needs_reshuffle(self, penetration: float) -> bool:
+        return self.remaining() < int(len(self.cards) * (1 - penetration))
+
+    @staticmethod
+    def card_value(card: Tuple[str, str, int]) -> int:
+        return card[2]
+
+    @staticmethod
+    def card_label(card: Tuple[str, str, int]) -> str:
+        return card_str(card)
+
+
+# Integer card codes 0..51 index one deck laid out like make_shoe_cards(1).
+CARD_TUPLES = make_shoe_cards(1)
+CARD_VALUES = [c[2] for c in CARD_TUPLES]
+CARD_RANKS = [c[0] for c in CARD_TUPLES]
+CARD_SUITS = [c[1] for c in CARD_TUPLES]
+CARD_LABELS = [f"{r}{s}" for r, s, _ in CARD_TUPLES]
+
+
+class ArrayShoe:
+    # Drop-in Shoe over a preallocated np.int8 array of card codes. Shuffling permutes the
+    # array in place and deal() returns a plain int; labels are looked up only for the UI.
+    # With the same Generator it deals the same sequence (and count) as Shoe.
+    def __init__(self, decks: int, rng: np.random.Generator, count_system: str = "hilo"):
+        self.decks = decks
+        self.rng = rng
+        self.tags = COUNT_SYSTEMS[count_system]
+        self._code_tags = [self.tags[v] for v in CARD_VALUES]
+        self.cards = np.tile(np.arange(len(CARD_TUPLES), dtype=np.int8), decks)
+        self._codes = memoryview(self.cards)  # indexing yields ints, not numpy scalars
+        self.shuffle()
+
+    def shuffle(self) -> None:
+        self.rng.shuffle(self.cards)
+        self.i = 0
+        self.running = 0
+
+    def remaining(self) -> int:
+        return len(self.cards) - self.i
+
+    def deal(self) -> int:
+        c = self._codes[self.i]
+        self.i += 1
+        self.running += self._code_tags[c]
+        return c
+
+    def true_count(self, hidden: int = 0) -> float:
+        return (self.running - hidden) / max(self.remaining() / 52.0, MIN_DECKS_REMAINING)
+
+    def needs_reshuffle(self, penetration: float) -> bool:
+        return self.remaining() < int(len(self.cards) * (1 - penetration))
+
+    @staticmethod
+    def card_value(card: int) -> int:
+        return CARD_VALUES[card]
+
+    @staticmethod
+    def card_label(card: int) -> str:
+        return CARD_LABELS[card]
+
+
+SHOE_TYPES = {"list": Shoe, "array": ArrayShoe}
+
+
+# =========================
+# HAND UTILS
+# =========================
+class Hand:
+    # Running hard total and ace count are kept as cards arrive, so value queries are O(1).
+    # Cards are whatever the shoe deals (tuples or int codes); values are passed alongside.
+    __slots__ = ("cards", "hard", "aces", "v0", "v1", "doubled", "is_split_aces", "from_split")
+
+    def __init__(
+        self,
+        cards: Optional[List[Tuple[str, str, int]]] = None,
+        doubled: bool = False,
+        is_split_aces: bool = False,
+        from_split: bool = False,
+    ):
+        self.cards: list = []
+        self.hard = 0
+        self.aces = 0
+        self.v0 = 0  # values of the first two cards, for pairs and splits
+        self.v1 = 0
+        self.doubled = doubled
+        self.is_split_aces = is_split_aces
+        self.from_split = from_split
+        for c in cards or ():
+            self.add(c, c[2])
+
+    def __repr__(self) -> str:
+        return f"Hand({self.cards!r}, doubled={self.doubled}, is_split_aces={self.is_split_aces})"
+
+    def add(self, card, value: int) -> None:
+        n = len(self.cards)
+        if n == 0:
+            self.v0 = value
+        elif n == 1:
+            self.v1 = value
+        self.cards.append(card)
+        self.hard += value
+        if value == 1:
+            self.aces += 1
+
+    def split_off(self):
+        # Take back the second card of a two-card hand, leaving the first.
+        card = self.cards.pop()
+        self.hard = self.v0
+        self.aces = 1 if self.v0 == 1 else 0
+        self.v1 = 0
+        return card
+
+    def value(self) -> Tuple[int, bool]:
+        # Same result as hand_value(self.cards): at most one ace can count as 11.
+        if self.aces and self.hard <= 11:
+            return self.hard + 10, True
+        return self.hard, False
+
+    def is_blackjack(self) -> bool:
+        return len(self.cards) == 2 and self.aces == 1 and self.hard == 11
+
+    def is_pair(self) -> bool:
+        return len(self.cards) == 2 and self.v0 == self.v1
+
+
+def cards_values(cards: List[Tuple[str, str, int]]) -> List[int]:
+    return [c[2] for c in cards]
+
+
+def hand_value(cards: List[Tuple[str, str, int]]) -> Tuple[int, bool]:
+    vals = cards_values(cards)
+    total = sum(vals)
+    aces = sum(1 for v in vals if v == 1)
+    is_soft = False
+    while aces > 0 and total + 10 <= 21:
+        total += 10
+        aces -= 1
+        is_soft = True
+    return total, is_soft
+
+
+def is_blackjack(cards: List[Tuple[str, str, int]]) -> bool:
+    if len(cards) != 2:
+        return False
+    vals = cards_values(cards)
+    return (1 in vals) and (10 in vals)
+
+
+def is_pair(cards: List[Tuple[str, str, int]]) -> bool:
+    if len(cards) != 2:
+        return False
+    return cards[0][2] == cards[1][2]
+
+
+def card_str(card: Tuple[str, str, int]) -> str:
+    r, s, _ = card
+    return f"{r}{s}"
+
+
+# =========================
+# BASIC STRATEGY (S17 + DAS-ish)
+# =========================
+def basic_strategy(player_cards: List[Tuple[str, str, int]], dealer_upcard: Tuple[str, str, int]) -> str:
+    up = dealer_upcard[2] if dealer_upcard[2] != 1 else 1
+
+    # Pairs
+    if is_pair(player_cards):
+        v = player_cards[0][2]
+        if v == 1:
+            return "P"  # AA
+        if v == 8:
+            return "P"  # 88
+        if v == 10:
+            return "S"  # TT
+        if v == 9:
+            return "P" if up in [2, 3, 4, 5, 6, 8, 9] else "S"
+        if v == 7:
+            return "P" if up in [2, 3, 4, 5, 6, 7] else "H"
+        if v == 6:
+            return "P" if up in [2, 3, 4, 5, 6] else "H"
+        if v == 5:
+            return "D" if up in [2, 3, 4, 5, 6, 7, 8, 9] else "H"
+        if v == 4:
+            return "P" if up in [5, 6] else "H"
+        if v in [2, 3]:
+            return "P" if up in [2, 3, 4, 5, 6, 7] else "H"
+
+    total, soft = hand_value(player_cards)
+
+    # Soft totals
+    if soft:
+        if total <= 17:
+            if total in [13, 14]:
+                return "D" if up in [5, 6] else "H"
+            if total in [15, 16]:
+                return "D" if up in [4, 5, 6] else "H"
+            if total == 17:
+                return "D" if up in [3, 4, 5, 6] else "H"
+            return "H"  # soft 12: A,A that can no longer be split
+        if total == 18:
+            if up in [3, 4, 5, 6]:
+                return "D"
+            if up in [2, 7, 8]:
+                return "S"
+            return "H"
+        return "S"
+
+    # Hard totals
+    if total <= 8:
+        return "H"
+    if total == 9:
+        return "D" if up in [3, 4, 5, 6] else "H"
+    if total == 10:
+        return "D" if up in [2, 3, 4, 5, 6, 7, 8, 9] else "H"
+    if total == 11:
+        return "D" if up != 1 else "H"
+    if total == 12:
+        return "S" if up in [4, 5, 6] else "H"
+    if total in [13, 14, 15, 16]:
+        return "S" if up in [2, 3, 4, 5, 6] else "H"
+    return "S"
+
+
+# =========================
+# STRATEGY TABLE
+# =========================
+# Decision codes. "D" doubles or else hits, "Ds" doubles or else stands.
+STRATEGY_ACTIONS = ("H", "S", "D", "P", "Ds")
+UPCARD_COLUMNS = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "A"]
+
+
+class StrategyTable:
+    # Dense chart of STRATEGY_ACTIONS codes:
+    #   hard[total, up]  hard totals 4..21
+    #   soft[total, up]  soft totals 12..21
+    #   pair[value, up]  splittable pairs by card value (A=1)
+    # `up` is the dealer upcard value (A=1); column 0 is unused.
+    def __init__(self, hard: np.ndarray, soft: np.ndarray, pair: np.ndarray, name: str = "custom"):
+        self.hard = np.asarray(hard, dtype=np.int8)
+        self.soft = np.asarray(soft, dtype=np.int8)
+        self.pair = np.asarray(pair, dtype=np.int8)
+        self.name = name
+        # Nested lists of action strings keep scalar lookups free of numpy overhead.
+        self._hard = [[STRATEGY_ACTIONS[c] for c in row] for row in self.hard.tolist()]
+        self._soft = [[STRATEGY_ACTIONS[c] for c in row] for row in self.soft.tolist()]
+        self._pair = [[STRATEGY_ACTIONS[c] for c in row] for row in self.pair.tolist()]
+
+    def decide(self, total: int, soft: bool, pair_value: int, up: int) -> str:
+        # pair_value is the card value of a pair that may still be split, else 0.
+        if pair_value:
+            return self._pair[pair_value][up]
+        if soft:
+            return self._soft[total][up]
+        return self._hard[total][up]
+
+    @classmethod
+    def compile(cls, name: str = "basic") -> "StrategyTable":
+        hard = np.zeros((22, 11), dtype=np.int8)
+        soft = np.zeros((22, 11), dtype=np.int8)
+        pair = np.zeros((11, 11), dtype=np.int8)
+        for up in range(1, 11):
+            upcard = ("", "", up)
+            # Synthetic hands: one card of value `total` is a non-pair hard hand,
+            # and A,A padded with a zero card is a soft 12 that is not a pair.
+            for total in range(4, 22):
+                hard[total, up] = STRATEGY_ACTIONS.index(basic_strategy([("", "", total)], upcard))
+            soft[12, up] = STRATEGY_ACTIONS.index(basic_strategy([("A", "", 1), ("", "", 0), ("A", "", 1)], upcard))
+            for total in range(13, 22):
+                soft[total, up] = STRATEGY_ACTIONS.index(basic_strategy([("A", "", 1), ("", "", total - 11)], upcard))
+            for v in range(1, 11):
+                pair[v, up] = STRATEGY_ACTIONS.index(basic_strategy([("", "", v), ("", "", v)], upcard))
+        return cls(hard, soft, pair, name=name)
+
+    def _rows(self):
+        for total in range(4, 22):
+            yield f"H{total}", self.hard, total
+        for total in range(12, 22):
+            yield f"S{total}", self.soft, total
+        for v in range(2, 11):
+            yield f"P{v}", self.pair, v
+        yield "PA", self.pair, 1
+
+    def to_text(self) -> str:
+        lines = [f"# name: {self.name}", "#    " + " ".join(f"{c:>3}" for c in UPCARD_COLUMNS)]
+        for key, grid, idx in self._rows():
+            cells = [STRATEGY_ACTIONS[grid[idx, up]] for up in list(range(2, 11)) + [1]]
+            lines.append(f"{key:<4} " + " ".join(f"{c:>3}" for c in cells))
+        return "\n".join(lines) + "\n"
+
+    def to_file(self, path: str) -> None:
+        Path(path).write_text(self.to_text(), encoding="utf-8")
+
+    @classmethod
+    def from_text(cls, text: str, base: Optional["StrategyTable"] = None) -> "StrategyTable":
+        # Rows not listed keep the base chart's decisions, so a file may hold only deltas.
+        base = base if base is not None else StrategyTable.compile()
+        hard, soft, pair = base.hard.copy(), base.soft.copy(), base.pair.copy()
+        grids = {"H": hard, "S": soft, "P": pair}
+        name = "custom"
+        for n, raw in enumerate(text.splitlines(), start=1):
+            line = raw.strip()
+            if line.startswith("# name:"):
+                name = line[len("# name:"):].strip() or name
+                continue
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            key, *cells = line.split()
+            kind, label = key[:1].upper(), key[1:].upper()
+            if kind not in grids or len(cells) != len(UPCARD_COLUMNS):
+                raise ValueError(f"strategy chart line {n}: expected <H|S|P><total> and {len(UPCARD_COLUMNS)} actions")
+            idx = 1 if label == "A" else int(label)
+            if not (0 <= idx < grids[kind].shape[0]):
+                raise ValueError(f"strategy chart line {n}: row {key} out of range")
+            for col, cell in zip(UPCARD_COLUMNS, cells):
+                cell = cell.capitalize()
+                if cell not in STRATEGY_ACTIONS:
+                    raise ValueError(f"strategy chart line {n}: unknown action {cell!r}")
+                up = 1 if col == "A" else int(col)
+                grids[kind][idx, up] = STRATEGY_ACTIONS.index(cell)
+        return cls(hard, soft, pair, name=name)
+
+    @classmethod
+    def from_file(cls, path: str, base: Optional["StrategyTable"] = None) -> "StrategyTable":
+        return cls.from_text(Path(path).read_text(encoding="utf-8"), base=base)
+
+
+_STRATEGY_TABLES: dict = {}
+# strategy_path value selecting the chart computed for the Rules by ev.optimal_strategy.
+OPTIMAL_STRATEGY = "optimal"
+
+
+def strategy_table(rules: Rules, path: Optional[str] = None) -> StrategyTable:
+    # Compiled once per (Rules, chart file) and shared by every engine instance.
+    key = (rules, path or "")
+    table = _STRATEGY_TABLES.get(key)
+    if table is None:
+        if path == OPTIMAL_STRATEGY:
+            from ev import optimal_strategy
+
+            table = optimal_strategy(rules)
+        else:
+            table = StrategyTable.from_file(path) if path else StrategyTable.compile()
+        _STRATEGY_TABLES[key] = table
+    return table
+
+
+# =========================
+# BETTING / DEVIATIONS
+# =========================
+# What BlackjackEnv needs from a player: StrategyTable and BetRamp are the stock
+# implementations; anything with the same methods can be passed in their place.
+class Strategy(Protocol):
+    name: str
+
+    def decide(self, total: int, soft: bool, pair_value: int, up: int) -> str:
+        # One of STRATEGY_ACTIONS; pair_value is 0 unless the hand may be split.
+        ...
+
+
+class BetPolicy(Protocol):
+    name: str
+
+    def units(self, true_count: float) -> float:
+        # Bet size in base-bet units for the next round.
+        ...
+
+
+class CountStrategy(Protocol):
+    name: str
+
+    def table(self, true_count: float) -> Strategy:
+        # Strategy to play this round at the given true count.
+        ...
+
+
+class BetRamp:
+    # Bet size in base-bet units from the true count: each step is (count, units) and the
+    # highest step whose count is <= the true count applies; below the first step, its units.
+    def __init__(self, steps: Sequence[Tuple[float, float]], name: str = "ramp"):
+        steps = sorted(steps)
+        self.counts = [float(c) for c, _ in steps]
+        self.units_by_step = [float(u) for _, u in steps]
+        self.name = name
+
+    def units(self, true_count: float) -> float:
+        return self.units_by_step[max(0, bisect.bisect_right(self.counts, true_count) - 1)]
+
+
+BET_POLICIES = {
+    "flat": None,  # base bet every hand; the engine skips the count lookup
+    "1-8": BetRamp([(1, 1), (2, 2), (3, 4), (4, 6), (5, 8)], name="1-8"),
+    "1-12": BetRamp([(1, 1), (2, 2), (3, 4), (4, 8), (5, 12)], name="1-12"),
+}
+
+# Count-indexed chart changes: (row, upcard column, index, action at or above the index,
+# action below it), with rows and columns as in chart files. These are the Hi-Lo
+# "Illustrious 18" indices; insurance is left out because the engine offers none.
+ILLUSTRIOUS_18 = (
+    ("H16", "10", 0, "S", "H"),
+    ("H15", "10", 4, "S", "H"),
+    ("P10", "5", 5, "P", "S"),
+    ("P10", "6", 4, "P", "S"),
+    ("H10", "10", 4, "D", "H"),
+    ("H12", "3", 2, "S", "H"),
+    ("H12", "2", 3, "S", "H"),
+    ("H11", "A", 1, "D", "H"),
+    ("H9", "2", 1, "D", "H"),
+    ("H10", "A", 4, "D", "H"),
+    ("H9", "7", 3, "D", "H"),
+    ("H16", "9", 5, "S", "H"),
+    ("H13", "2", -1, "S", "H"),
+    ("H12", "4", 0, "S", "H"),
+    ("H12", "5", -2, "S", "H"),
+    ("H12", "6", -1, "S", "H"),
+    ("H13", "3", -2, "S", "H"),
+)
+DEVIATION_SETS = {"i18": ILLUSTRIOUS_18}
+
+
+class DeviationTables:
+    # One StrategyTable per integer true count from just below the lowest index up to the
+    # highest, so applying count-based deviations costs one lookup per round.
+    def __init__(self, base: StrategyTable, deviations: Sequence[Tuple[str, str, float, str, str]], name: str = "i18"):
+        self.lo = min(int(np.floor(d[2])) for d in deviations) - 1
+        self.hi = max(int(np.ceil(d[2])) for d in deviations)
+        self.name = name
+        self.tables = []
+        for t in range(self.lo, self.hi + 1):
+            grids = {"H": base.hard.copy(), "S": base.soft.copy(), "P": base.pair.copy()}
+            for row, col, index, above, below in deviations:
+                idx = 1 if row[1:].upper() == "A" else int(row[1:])
+                up = 1 if col == "A" else int(col)
+                grids[row[0].upper()][idx, up] = STRATEGY_ACTIONS.index(above if t >= index else below)
+            self.tables.append(StrategyTable(grids["H"], grids["S"], grids["P"], name=f"{base.name} +{name}@{t}"))
+
+    def table(self, true_count: float) -> StrategyTable:
+        t = int(np.floor(true_count))
+        return self.tables[min(max(t, self.lo), self.hi) - self.lo]
+
+
+def deviation_tables(rules: Rules, path: Optional[str], deviations: str) -> Optional[DeviationTables]:
+    if not deviations:
+        return None
+    key = (rules, path or "", "deviations", deviations)
+    tables = _STRATEGY_TABLES.get(key)
+    if tables is None:
+        tables = DeviationTables(strategy_table(rules, path), DEVIATION_SETS[deviations], name=deviations)
+        _STRATEGY_TABLES[key] = tables
+    return tables
+
+
+# =========================
+# ENGINE
+# =========================
+@dataclass
+class RoundResult:
+    profit: float
+    bet: float
+    outcome: str
+    dealer_total: int
+    player_hands: int
+
+
+class BlackjackEnv:
+    def __init__(
+        self,
+        rules: Rules,
+        rng: np.random.Generator,
+        strategy: Optional[Strategy] = None,
+        shoe_cls: type = Shoe,
+        count_system: str = "hilo",
+        betting: Optional[BetPolicy] = None,
+        deviations: Optional[CountStrategy] = None,
+    ):
+        self.rules = rules
+        self.rng = rng
+        self.shoe = shoe_cls(rules.decks, rng, count_system)
+        self.strategy = strategy if strategy is not None else strategy_table(rules)
+        # Both are read from the shoe's running count: the bet before the deal, the
+        # deviation chart once per round after it (hole card excluded).
+        self.betting = betting
+        self.deviations = deviations
+
+    def _dealer_play(self, dealer: Hand, trace: Optional[List[dict]]) -> int:
+        shoe = self.shoe
+        while True:
+            total, soft = dealer.value()
+            if total > 17:
+                return total
+            if total == 17 and (not soft or self.rules.dealer_stands_soft_17):
+                return total
+            c = shoe.deal()
+            dealer.add(c, shoe.card_value(c))
+            if trace is not None:
+                trace.append({"actor": "dealer", "action": "HIT", "card": shoe.card_label(c)})
+
+    def _settle_hand(self, hand: Hand, dealer_total: int, bet: float, dealer_bj: bool) -> Tuple[float, str]:
+        total, _ = hand.value()
+        if total > 21:
+            return -bet, "LOSE"
+
+        player_bj = hand.is_blackjack() and not hand.is_split_aces
+        if player_bj and not dealer_bj:
+            return bet * self.rules.blackjack_payout, "BJ"
+        if dealer_bj and not player_bj:
+            return -bet, "LOSE"
+
+        if dealer_total > 21:
+            return bet, "WIN"
+        if total > dealer_total:
+            return bet, "WIN"
+        if total < dealer_total:
+            return -bet, "LOSE"
+        return 0.0, "PUSH"
+
+    def _play_round(
+        self, bet: float, trace: Optional[List[dict]]
+    ) -> Tuple[RoundResult, List[Hand], Hand, bool]:
+        # trace=None is the headless path: no card strings, no trace dicts.
+        reshuffle = False
+        if self.shoe.needs_reshuffle(self.rules.penetration):
+            reshuffle = True
+            self.shoe.shuffle()
+            if trace is not None:
+                trace.append({"actor": "shoe", "action": "SHUFFLE"})
+
+        shoe = self.shoe
+        value = shoe.card_value
+        label = shoe.card_label
+        if self.betting is not None:
+            bet *= self.betting.units(shoe.true_count())
+
+        p1 = shoe.deal()
+        d1 = shoe.deal()
+        p2 = shoe.deal()
+        d2 = shoe.deal()
+
+        player = Hand()
+        player.add(p1, value(p1))
+        player.add(p2, value(p2))
+        dealer = Hand()
+        dealer.add(d1, value(d1))
+        dealer.add(d2, value(d2))
+        up = dealer.v0
+        dealer_bj = dealer.is_blackjack()
+        strategy = self.strategy
+        if self.deviations is not None:
+            strategy = self.deviations.table(shoe.true_count(hidden=shoe.tags[dealer.v1]))
+
+        if trace is not None:
+            trace.append({"actor": "shoe", "action": "DEAL", "to": "player", "card": label(p1)})
+            trace.append({"actor": "shoe", "action": "DEAL", "to": "dealer", "card": label(d1)})
+            trace.append({"actor": "shoe", "action": "DEAL", "to": "player", "card": label(p2)})
+            trace.append({"actor": "shoe", "action": "DEAL", "to": "dealer", "card": "🂠"})
+
+        hands: List[Hand] = [player]
+        split_count = 0
+
+        i = 0
+        while i < len(hands):
+            h = hands[i]
+
+            while True:
+                total, soft = h.value()
+                if total >= 21:
+                    break
+
+                can_split = (
+                    split_count < self.rules.max_splits
+                    and h.is_pair()
+                    and (not h.is_split_aces or self.rules.allow_resplit_aces)
+                )
+                # Split aces: one card only (typical rules), unless resplit
+                if h.is_split_aces and not can_split:
+                    break
+                can_double = len(h.cards) == 2 and (self.rules.double_after_split or not h.from_split)
+
+                action = strategy.decide(total, soft, h.v0 if can_split else 0, up)
+
+                # Split
+                if action == "P" and can_split:
+                    split_count += 1
+                    pair_value = h.v0
+                    c1 = h.split_off()
+
+                    a = shoe.deal()
+                    h.add(a, value(a))
+                    h.from_split = True
+                    new_hand = Hand(from_split=True)
+                    new_hand.add(c1, pair_value)
+                    b = shoe.deal()
+                    new_hand.add(b, value(b))
+                    if trace is not None:
+                        trace.append({"actor": "player", "action": "SPLIT"})
+                        trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{i+1}", "card": label(a)})
+                        trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{len(hands)+1}", "card": label(b)})
+
+                    if pair_value == 1:
+                        h.is_split_aces = True
+                        new_hand.is_split_aces = True
+
+                    hands.append(new_hand)
+                    continue
+
+                # Double
+                if (action == "D" or action == "Ds") and can_double:
+                    h.doubled = True
+                    c = shoe.deal()
+                    h.add(c, value(c))
+                    if trace is not None:
+                        trace.append({"actor": "player", "action": "DOUBLE", "hand": i + 1})
+                        trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{i+1}", "card": label(c)})
+                    break
+
+                # Stand
+                if action == "S" or action == "Ds":
+                    if trace is not None:
+                        trace.append({"actor": "player", "action": "STAND", "hand": i + 1})
+                    break
+
+                # Hit
+                c = shoe.deal()
+                h.add(c, value(c))
+                if trace is not None:
+                    trace.append({"actor": "player", "action": "HIT", "hand": i + 1})
+                    trace.append({"actor": "shoe", "action": "DEAL", "to": f"hand_{i+1}", "card": label(c)})
+
+            i += 1
+
+        if trace is not None:
+            trace.append({"actor": "dealer", "action": "REVEAL", "card": label(d2)})
+        dealer_total = self._dealer_play(dealer, trace)
+
+        profit_total = 0.0
+        outcomes = []
+        for h in hands:
+            hb = bet * (2.0 if h.doubled else 1.0)
+            p, out = self._settle_hand(h, dealer_total, hb, dealer_bj)
+            profit_total += p
+            outcomes.append(out)
+
+        outcome = "PUSH"
+        if "LOSE" in outcomes and "WIN" not in outcomes and "BJ" not in outcomes:
+            outcome = "LOSE"
+        if "WIN" in outcomes:
+            outcome = "WIN"
+        if "BJ" in outcomes:
+            outcome = "BJ"
+
+        if trace is not None:
+            trace.append({"actor": "settle", "action": outcome, "pnl": float(profit_total)})
+
+        rr = RoundResult(
+            profit=float(profit_total),
+            bet=float(bet),
+            outcome=outcome,
+            dealer_total=int(dealer_total),
+            player_hands=len(hands),
+        )
+        return rr, hands, dealer, reshuffle
+
+    def play_round(self, bet: float) -> RoundResult:
+        rr, _, _, _ = self._play_round(bet, None)
+        return rr
+
+    def play_round_verbose(self, bet: float) -> Tuple[RoundResult, dict]:
+        trace: List[dict] = []
+        rr, hands, dealer, reshuffle = self._play_round(bet, trace)
+
+        label = self.shoe.card_label
+        payload = {
+            "dealer_cards_ui": [label(dealer.cards[0]), label(dealer.cards[1])],
+            "player_hands_ui": [[label(c) for c in h.cards] for h in hands],
+            "trace": trace,
+            "shoe_remaining": int(self.shoe.remaining()),
+            "reshuffle": bool(reshuffle),
+        }
+        return rr, payload
+
+
+# =========================
+# SURVIVAL ECONOMY
+# =========================
+class ExperimentOverError(RuntimeError):
+    pass
+
+
+class CreditManager:
+    def __init__(self, econ: SurvivalEconomy):
+        self.econ = econ
+        self.credits = float(econ.initial_credits)
+
+    def step(self, profit: float) -> dict:
+        self.credits -= self.econ.burn_per_hand
+
+        if profit > 0:
+            self.credits += profit * self.econ.tax_rate_on_positive_profit
+
+        refill = False
+        if self.credits <= self.econ.refill_threshold:
+            self.credits += self.econ.refill_amount
+            refill = True
+
+        if self.credits <= self.econ.death_threshold:
+            raise ExperimentOverError("Credits depleted. The experiment ends.")
+
+        return {"credits": self.credits, "refill": refill}
+
+    def at_risk(self) -> bool:
+        # Tax and refill only ever add credits, so the next step can be fatal
+        # only if the burn alone reaches the death threshold.
+        return self.credits - self.econ.burn_per_hand <= self.econ.death_threshold
+
+
+# =========================
+# OPTIONAL LOGGING
+# =========================
+def append_jsonl(log_path: Optional[str], record: dict) -> None:
+    if not log_path:
+        return
+    p = Path(log_path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    with open(p, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class EventWriter:
+    # Buffered JSONL writer. Records are queued and appended in one write once
+    # `max_records` are pending or `max_age_s` has passed since the last flush.
+    # A ".gz" path is written as appended gzip members (readable with gzip.open);
+    # max_bytes > 0 rotates the file to path.1 .. path.<backups> before it grows past it.
+    def __init__(
+        self,
+        path: str,
+        max_records: int = 512,
+        max_age_s: float = 2.0,
+        max_bytes: int = 0,
+        backups: int = 3,
+    ):
+        self.path = Path(path)
+        self.max_records = max(1, int(max_records))
+        self.max_age_s = float(max_age_s)
+        self.max_bytes = int(max_bytes)
+        self.backups = max(1, int(backups))
+        self.gzip = self.path.suffix == ".gz"
+        self._buf: List[str] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buf.append(line)
+            if len(self._buf) >= self.max_records or time.monotonic() - self._last_flush >= self.max_age_s:
+                self._flush_locked()
+
+    def flush(self, stale_only: bool = False) -> None:
+        with self._lock:
+            if stale_only and time.monotonic() - self._last_flush < self.max_age_s:
+                return
+            self._flush_locked()
+
+    def close(self) -> None:
+        self.flush()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buf:
+            return
+        data = "".join(self._buf).encode("utf-8")
+        self._buf.clear()
+        if self.gzip:
+            data = gzip.compress(data)
+        if self.max_bytes > 0 and self.path.exists() and self.path.stat().st_size + len(data) > self.max_bytes:
+            self._rotate()
+        with open(self.path, "ab") as f:
+            f.write(data)
+
+    def _rotate(self) -> None:
+        for n in range(self.backups - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{n}")
+            if src.exists():
+                src.replace(self.path.with_name(f"{self.path.name}.{n + 1}"))
+        self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+
+
+# One writer per log path, shared by every session in the process.
+# A path ending in ".cols" is a columnar run log (runlog.py), anything else is JSONL.
+_EVENT_WRITERS: Dict[str, object] = {}
+_EVENT_WRITERS_LOCK = threading.Lock()
+
+
+def event_writer(log_path: Optional[str]):
+    if not log_path:
+        return None
+    w = _EVENT_WRITERS.get(log_path)
+    if w is None:
+        with _EVENT_WRITERS_LOCK:
+            w = _EVENT_WRITERS.get(log_path)
+            if w is None:
+                cls = ColumnarLog if log_path.rstrip("/\\").endswith(".cols") else EventWriter
+                w = _EVENT_WRITERS[log_path] = cls(log_path)
+    return w
+
+
+def flush_event_writers(stale_only: bool = False) -> None:
+    for w in list(_EVENT_WRITERS.values()):
+        w.flush(stale_only=stale_only)
+
+
+atexit.register(flush_event_writers)
+
+
+# =========================
+# RUN STATE
+# =========================
+class RunningStats:
+    # Streaming per-hand aggregates (Welford mean/variance of profit, refills), updated in
+    # O(1) per hand so the HUD and summaries never rescan the event history.
+    __slots__ = ("n", "mean", "m2", "refills", "best", "worst")
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.refills = 0
+        self.best = 0.0
+        self.worst = 0.0
+
+    def push(self, profit: float, refill: bool) -> None:
+        self.n += 1
+        d = profit - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (profit - self.mean)
+        if refill:
+            self.refills += 1
+        if profit > self.best:
+            self.best = profit
+        if profit < self.worst:
+            self.worst = profit
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+    @property
+    def stderr(self) -> float:
+        return (self.variance / self.n) ** 0.5 if self.n > 1 else 0.0
+
+
+def make_env(
+    cfg: RunConfig,
+    rules: Rules,
+    rng: np.random.Generator,
+    strategy: Optional[Strategy] = None,
+    betting: Optional[BetPolicy] = None,
+) -> BlackjackEnv:
+    # strategy / betting, when given, replace the ones named in cfg.
+    path = cfg.strategy_path or None
+    return BlackjackEnv(
+        rules,
+        rng,
+        strategy if strategy is not None else strategy_table(rules, path),
+        SHOE_TYPES[cfg.shoe],
+        count_system=cfg.count_system,
+        betting=betting if betting is not None else BET_POLICIES[cfg.bet_policy],
+        deviations=None if strategy is not None else deviation_tables(rules, path, cfg.deviations),
+    )
+
+
+def new_sim_state(
+    cfg: RunConfig,
+    rules: Rules,
+    econ: SurvivalEconomy,
+    seed: Optional[np.random.SeedSequence] = None,
+    strategy: Optional[Strategy] = None,
+    betting: Optional[BetPolicy] = None,
+) -> dict:
+    # Simulation part of a run state dict; app.init_state adds the UI keys on top. seed
+    # (farm replicates) replaces cfg.seed; strategy / betting as in make_env.
+    rng = np.random.default_rng(cfg.seed if seed is None else seed)
+    return {
+        "rng": rng,
+        "cfg": cfg,
+        "rules": rules,
+        "econ": econ,
+        "env": make_env(cfg, rules, rng, strategy, betting),
+        "credits": CreditManager(econ),
+        "bankroll": float(cfg.initial_bankroll),
+        "net_profit": 0.0,
+        "hand": 0,
+        "peak_bankroll": float(cfg.initial_bankroll),
+        "max_drawdown": 0.0,
+        "wins": 0,
+        "pushes": 0,
+        "losses": 0,
+        "bjs": 0,
+        "status": "ALIVE",
+        "stats": RunningStats(),
+    }
+
+
+_OUTCOME_COUNTERS = {"WIN": "wins", "PUSH": "pushes", "LOSE": "losses", "BJ": "bjs"}
+
+
+def update_drawdown_and_counters(state: dict, outcome: str):
+    bankroll = state["bankroll"]
+    if bankroll > state["peak_bankroll"]:
+        state["peak_bankroll"] = bankroll
+    elif state["peak_bankroll"] - bankroll > state["max_drawdown"]:
+        state["max_drawdown"] = state["peak_bankroll"] - bankroll
+
+    counter = _OUTCOME_COUNTERS.get(outcome)
+    if counter is not None:
+        state[counter] += 1
+
+
+HandStep = Tuple[RoundResult, Optional[dict], dict, bool]
+
+
+def play_hand(state: dict, verbose: bool = False) -> Optional[HandStep]:
+    # Advances a run state by one hand: (round, trace payload or None, event record, reshuffled).
+    # Returns None when nothing was dealt: the run is over, or the bankroll is gone (the hand
+    # counter still moves on, as the app always did). verbose only adds the trace.
+    cfg: RunConfig = state["cfg"]
+    env: BlackjackEnv = state["env"]
+    credits: CreditManager = state["credits"]
+
+    if state["status"] == "DEAD" or state["hand"] >= cfg.hands_cap:
+        return None
+    if state["bankroll"] <= 0:
+        state["hand"] += 1
+        return None
+
+    bet = float(cfg.base_bet)
+    if verbose:
+        rr, payload = env.play_round_verbose(bet=bet)
+        reshuffle = bool(payload["reshuffle"])
+    else:
+        reshuffle = env.shoe.needs_reshuffle(env.rules.penetration)
+        rr = env.play_round(bet=bet)
+        payload = None
+
+    state["bankroll"] += rr.profit
+    state["net_profit"] += rr.profit
+    state["hand"] += 1
+    update_drawdown_and_counters(state, rr.outcome)
+
+    refill = False
+    try:
+        cstat = credits.step(rr.profit)
+        refill = bool(cstat["refill"])
+        state["status"] = "ALIVE"
+    except ExperimentOverError:
+        state["status"] = "DEAD"
+
+    rec = {
+        "hand": state["hand"],
+        "bankroll": state["bankroll"],
+        "credits": float(credits.credits),
+        "net_profit": state["net_profit"],
+        "profit": rr.profit,
+        "bet": rr.bet,
+        "outcome": rr.outcome,
+        "refill": refill,
+        "status": state["status"],
+        "shoe_remaining": int(env.shoe.remaining()),
+    }
+    state["stats"].push(rr.profit, refill)
+    return rr, payload, rec, reshuffle
+
+
+def play_run(state: dict, on_hand: Optional[Callable[[HandStep], None]] = None) -> str:
+    # Plays trace-free hands until DEAD, broke or hands_cap, calling on_hand with each
+    # play_hand result; returns "DEAD", "BROKE" or "ALIVE" (hands_cap reached).
+    cfg: RunConfig = state["cfg"]
+    while True:
+        if state["bankroll"] <= 0 and state["status"] != "DEAD" and state["hand"] < cfg.hands_cap:
+            return "BROKE"
+        step = play_hand(state)
+        if step is None:
+            return state["status"]
+        if on_hand is not None:
+            on_hand(step)
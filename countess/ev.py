@@ -0,0 +1,403 @@
+# ev.py
+# COUNTESS — exact blackjack probabilities by shoe composition (simulation only).
+# A composition is a tuple of 10 rank counts indexed by card value - 1 (A, 2..9, ten-valued),
+# i.e. the unseen cards. The dealer's final-total distribution is computed by exact recursion
+# over draws without replacement and kept in a bounded LRU cache keyed by upcard, S17/H17 and
+# the (optionally bucketed) composition.
+#
+# The engine deals the hole card up front and settles a dealer blackjack after the player has
+# acted (no peek), so the distribution includes the dealer natural as its own outcome.
+#
+# Run:
+#   python ev.py dealer --decks 6
+#   python ev.py dealer --decks 1 --h17 --remove 10,10,6
+#   python ev.py strategy --decks 6 --h17            # optimal chart and its differences from the built-in one
+#   python ev.py strategy --decks 2 --no-das --refresh --out strategies/2d_nodas.txt
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine import STRATEGY_ACTIONS, UPCARD_COLUMNS, Rules, StrategyTable
+
+
+Composition = Tuple[int, ...]
+
+# Final dealer outcomes, in distribution order.
+DEALER_OUTCOMES = ("17", "18", "19", "20", "21", "BUST", "BJ")
+BUST, DEALER_BJ = 5, 6
+
+
+def shoe_composition(decks: int) -> Composition:
+    return (4 * decks,) * 9 + (16 * decks,)
+
+
+def remove_cards(comp: Composition, values: Iterable[int]) -> Composition:
+    counts = list(comp)
+    for v in values:
+        if counts[v - 1] <= 0:
+            raise ValueError(f"no card of value {v} left in the composition")
+        counts[v - 1] -= 1
+    return tuple(counts)
+
+
+def composition_of(values: Iterable[int]) -> Composition:
+    counts = [0] * 10
+    for v in values:
+        counts[v - 1] += 1
+    return tuple(counts)
+
+
+# =========================
+# DEALER DISTRIBUTION
+# =========================
+def dealer_distribution(up: int, comp: Composition, s17: bool = True) -> np.ndarray:
+    # P(final dealer outcome) for upcard value `up` (A=1) with `comp` still unseen, the hole
+    # card included. Exact: every draw is taken without replacement from `comp`.
+    memo: Dict[tuple, Tuple[float, ...]] = {}
+
+    def play(counts: Composition, hard: int, ace: bool, ncards: int) -> Tuple[float, ...]:
+        soft = ace and hard + 10 <= 21
+        total = hard + 10 if soft else hard
+        if ncards == 2 and total == 21:
+            return (0.0,) * DEALER_BJ + (1.0,)
+        if total > 21:
+            return (0.0,) * BUST + (1.0, 0.0)
+        if total > 17 or (total == 17 and (not soft or s17)):
+            out = [0.0] * len(DEALER_OUTCOMES)
+            out[total - 17] = 1.0
+            return tuple(out)
+
+        key = (counts, hard, ace, ncards == 1)
+        hit = memo.get(key)
+        if hit is not None:
+            return hit
+        n = sum(counts)
+        if n <= 0:
+            raise ValueError("composition ran out of cards mid-hand")
+        acc = [0.0] * len(DEALER_OUTCOMES)
+        for i, c in enumerate(counts):
+            if not c:
+                continue
+            nxt = counts[:i] + (c - 1,) + counts[i + 1:]
+            sub = play(nxt, hard + i + 1, ace or i == 0, ncards + 1)
+            w = c / n
+            for k, p in enumerate(sub):
+                if p:
+                    acc[k] += w * p
+        res = tuple(acc)
+        memo[key] = res
+        return res
+
+    return np.array(play(tuple(comp), up, up == 1, 1))
+
+
+class DealerCache:
+    # Bounded LRU over dealer_distribution. With bucket > 1 each rank count is rounded to a
+    # multiple of `bucket` before lookup (and the distribution is computed for that rounded
+    # composition), so nearby shoe states share one entry.
+    def __init__(self, maxsize: int = 4096, bucket: int = 1):
+        self.maxsize = max(1, int(maxsize))
+        self.bucket = max(1, int(bucket))
+        self._entries: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, up: int, comp: Composition, s17: bool) -> tuple:
+        if self.bucket > 1:
+            b = self.bucket
+            comp = tuple(int(round(c / b)) * b for c in comp)
+        return (int(up), bool(s17), tuple(comp))
+
+    def distribution(self, up: int, comp: Composition, s17: bool = True) -> np.ndarray:
+        key = self.key(up, comp, s17)
+        dist = self._entries.get(key)
+        if dist is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return dist
+        self.misses += 1
+        dist = dealer_distribution(key[0], key[2], key[1])
+        dist.setflags(write=False)
+        self._entries[key] = dist
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return dist
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+DEALER_CACHE = DealerCache()
+
+
+def dealer_probabilities(up: int, comp: Composition, s17: bool = True) -> np.ndarray:
+    return DEALER_CACHE.distribution(up, comp, s17)
+
+
+# =========================
+# EXPECTED VALUES
+# =========================
+def stand_ev(total: int, dist: Sequence[float], player_bj: bool = False, payout: float = 1.5) -> float:
+    # EV per unit bet of standing on `total` against a dealer outcome distribution.
+    p = np.asarray(dist, dtype=np.float64)
+    if player_bj:
+        return payout * (1.0 - p[DEALER_BJ])
+    if total > 21:
+        return -1.0
+    win = p[BUST] + (p[: total - 17].sum() if total > 17 else 0.0)
+    lose = p[DEALER_BJ] + (p[total - 16:BUST].sum() if total >= 17 else p[:BUST].sum())
+    return float(win - lose)
+
+
+def dealer_table(rules: Rules, comp: Optional[Composition] = None, cache: Optional[DealerCache] = None) -> np.ndarray:
+    # (upcard value 1..10) x DEALER_OUTCOMES for one shoe state; row 0 is unused.
+    cache = cache if cache is not None else DEALER_CACHE
+    comp = comp if comp is not None else shoe_composition(rules.decks)
+    table = np.zeros((11, len(DEALER_OUTCOMES)))
+    for up in range(1, 11):
+        if comp[up - 1]:
+            table[up] = cache.distribution(up, remove_cards(comp, [up]), rules.dealer_stands_soft_17)
+    return table
+
+
+# =========================
+# OPTIMAL STRATEGY
+# =========================
+# Bump when the EV model changes so persisted charts are recomputed.
+EV_MODEL_VERSION = 1
+STRATEGY_CACHE_DIR = Path(__file__).resolve().parent / "strategies" / "generated"
+
+_NO_CARDS: Composition = (0,) * 10
+
+
+def _total(hard: int, ace: bool) -> int:
+    return hard + 10 if ace and hard + 10 <= 21 else hard
+
+
+class HandEV:
+    # EVs per unit bet for one starting hand against one upcard, with `comp` the unseen cards
+    # after the player's two cards and the upcard. Player draws come out of `comp` exactly;
+    # the dealer distribution is the one for `comp` (cards the player draws later are not
+    # taken out of it). Hands stop at 21 like the engine.
+    def __init__(self, rules: Rules, up: int, comp: Composition, cache: Optional[DealerCache] = None):
+        self.rules = rules
+        self.comp = comp
+        self.n = sum(comp)
+        dist = (cache if cache is not None else DEALER_CACHE).distribution(up, comp, rules.dealer_stands_soft_17)
+        self._stand = [stand_ev(t, dist) for t in range(22)]
+        self._natural = stand_ev(21, dist, player_bj=True, payout=rules.blackjack_payout)
+        self._hit: Dict[tuple, float] = {}
+
+    def stand(self, total: int) -> float:
+        return self._stand[total] if total <= 21 else -1.0
+
+    def hit(self, hard: int, ace: bool, drawn: Composition = _NO_CARDS) -> float:
+        # Take one card, then keep playing hit/stand optimally.
+        key = (hard, ace, drawn)
+        ev = self._hit.get(key)
+        if ev is not None:
+            return ev
+        acc = 0.0
+        left = self.n - sum(drawn)
+        for i, c in enumerate(self.comp):
+            k = c - drawn[i]
+            if k <= 0:
+                continue
+            h, a = hard + i + 1, ace or i == 0
+            if h > 21:
+                acc -= k
+                continue
+            t = _total(h, a)
+            if t == 21:
+                acc += k * self._stand[21]
+                continue
+            nxt = drawn[:i] + (drawn[i] + 1,) + drawn[i + 1:]
+            acc += k * max(self._stand[t], self.hit(h, a, nxt))
+        ev = acc / left
+        self._hit[key] = ev
+        return ev
+
+    def double(self, hard: int, ace: bool) -> float:
+        acc = 0.0
+        for i, k in enumerate(self.comp):
+            if k:
+                acc += k * self.stand(_total(hard + i + 1, ace or i == 0))
+        return 2.0 * acc / self.n
+
+    def split(self, v: int) -> float:
+        # Both hands of a split pair. Each is the pair card plus one draw; split aces take
+        # that one card only. A two-card 21 on a non-ace split pays as a natural, as the engine
+        # settles it. Resplits are not modelled.
+        rules = self.rules
+        acc = 0.0
+        for i, k in enumerate(self.comp):
+            if not k:
+                continue
+            hard, ace = v + i + 1, v == 1 or i == 0
+            t = _total(hard, ace)
+            if v == 1:
+                ev = self._stand[t]
+            elif t == 21:
+                ev = self._natural
+            else:
+                drawn = _NO_CARDS[:i] + (1,) + _NO_CARDS[i + 1:]
+                ev = max(self._stand[t], self.hit(hard, ace, drawn))
+                if rules.double_after_split:
+                    ev = max(ev, self.double(hard, ace))
+            acc += k * ev
+        return 2.0 * acc / self.n
+
+
+def _chart_code(ev: Dict[str, float]) -> int:
+    # Best action as a STRATEGY_ACTIONS code; a double falls back to the better of hit/stand.
+    best = max(ev, key=ev.get)
+    if best == "D" and ev["S"] > ev["H"]:
+        best = "Ds"
+    return STRATEGY_ACTIONS.index(best)
+
+
+def compute_optimal_strategy(rules: Rules, cache: Optional[DealerCache] = None) -> StrategyTable:
+    # Hard and soft rows take the action with the best EV summed over every two-card start of
+    # that total, weighted by how often it is dealt; a total only reachable as a pair (hard 4,
+    # hard 20, soft 12) uses the pair itself. Pair rows compare splitting with the best
+    # non-split action for that pair.
+    stand = STRATEGY_ACTIONS.index("S")
+    hard_rows = np.full((22, 11), stand, dtype=np.int8)
+    soft_rows = np.full((22, 11), stand, dtype=np.int8)
+    pair_rows = np.full((11, 11), stand, dtype=np.int8)
+    full = shoe_composition(rules.decks)
+
+    for up in range(1, 11):
+        comp_up = remove_cards(full, [up])
+        totals: Dict[tuple, Dict[str, float]] = {}
+        pair_totals: Dict[tuple, Dict[str, float]] = {}
+        for a in range(1, 11):
+            for b in range(a, 11):
+                ca, cb = comp_up[a - 1], comp_up[b - 1]
+                weight = ca * cb if a != b else ca * (ca - 1) / 2
+                if weight <= 0:
+                    continue
+                hard, ace = a + b, a == 1 or b == 1
+                t = _total(hard, ace)
+                if t == 21:
+                    continue  # natural
+                he = HandEV(rules, up, remove_cards(comp_up, [a, b]), cache)
+                ev = {"H": he.hit(hard, ace), "S": he.stand(t), "D": he.double(hard, ace)}
+                row = (ace and hard + 10 <= 21, t)
+                bucket = pair_totals if a == b else totals
+                acc = bucket.setdefault(row, {"H": 0.0, "S": 0.0, "D": 0.0})
+                for k, x in ev.items():
+                    acc[k] += weight * x
+                if a == b:
+                    if rules.max_splits > 0:
+                        ev["P"] = he.split(a)
+                    pair_rows[a, up] = _chart_code(ev)
+        for (soft, t), ev in {**pair_totals, **totals}.items():
+            (soft_rows if soft else hard_rows)[t, up] = _chart_code(ev)
+
+    return StrategyTable(hard_rows, soft_rows, pair_rows, name=f"optimal {rules_label(rules)}")
+
+
+def rules_label(rules: Rules) -> str:
+    return (
+        f"{rules.decks}D {'S17' if rules.dealer_stands_soft_17 else 'H17'}"
+        f"{' DAS' if rules.double_after_split else ''}{' RSA' if rules.allow_resplit_aces else ''}"
+    )
+
+
+def rules_hash(rules: Rules) -> str:
+    blob = json.dumps({"ev_model": EV_MODEL_VERSION, **dataclasses.asdict(rules)}, sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+def optimal_strategy(rules: Rules, cache_dir: Optional[str] = None, refresh: bool = False) -> StrategyTable:
+    # Loaded from <cache_dir>/optimal-<rules hash>.txt when present, else computed and saved
+    # there (a chart file like the ones in strategies/, readable by StrategyTable.from_file).
+    root = Path(cache_dir) if cache_dir else STRATEGY_CACHE_DIR
+    path = root / f"optimal-{rules_hash(rules)}.txt"
+    if path.exists() and not refresh:
+        return StrategyTable.from_file(str(path))
+    table = compute_optimal_strategy(rules)
+    header = f"# rules: {json.dumps(dataclasses.asdict(rules), sort_keys=True)} ev_model={EV_MODEL_VERSION}\n"
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(header + table.to_text(), encoding="utf-8")
+        tmp.replace(path)
+    except OSError:
+        pass  # read-only checkout: the chart is still returned, just not persisted
+    return table
+
+
+def chart_differences(a: StrategyTable, b: StrategyTable) -> List[Tuple[str, str, str, str]]:
+    # (row, upcard, action in a, action in b) for every cell where two charts disagree.
+    out = []
+    for (key, grid_a, idx), (_, grid_b, _) in zip(a._rows(), b._rows()):
+        for up, col in zip(list(range(2, 11)) + [1], UPCARD_COLUMNS):
+            x, y = STRATEGY_ACTIONS[grid_a[idx, up]], STRATEGY_ACTIONS[grid_b[idx, up]]
+            if x != y:
+                out.append((key, col, x, y))
+    return out
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="COUNTESS exact blackjack probabilities (simulation only)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("dealer", help="dealer final-total distribution by upcard")
+    d.add_argument("--decks", type=int, default=Rules.decks)
+    d.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    d.add_argument("--remove", default="", help="card values already seen, e.g. 10,10,6 (A=1)")
+    s = sub.add_parser("strategy", help="optimal chart for the rules, diffed against the built-in chart")
+    s.add_argument("--decks", type=int, default=Rules.decks)
+    s.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    s.add_argument("--no-das", action="store_true", help="no double after split")
+    s.add_argument("--refresh", action="store_true", help="recompute even if a persisted chart exists")
+    s.add_argument("--out", default="", help="also write the chart to this file")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "strategy":
+        rules = Rules(decks=args.decks, dealer_stands_soft_17=not args.h17, double_after_split=not args.no_das)
+        t0 = time.perf_counter()
+        table = optimal_strategy(rules, refresh=args.refresh)
+        dt = time.perf_counter() - t0
+        print(table.to_text(), end="")
+        if args.out:
+            table.to_file(args.out)
+        diffs = chart_differences(StrategyTable.compile(), table)
+        print(f"\n{len(diffs)} cells differ from the built-in chart (row up: built-in -> optimal)")
+        for key, col, x, y in diffs:
+            print(f"  {key:<4} {col:>2}: {x:>2} -> {y}")
+        print(f"\n{rules_hash(rules)}  {dt * 1000:.0f} ms")
+        return
+
+    rules = Rules(decks=args.decks, dealer_stands_soft_17=not args.h17)
+    comp = shoe_composition(rules.decks)
+    if args.remove:
+        comp = remove_cards(comp, [int(v) for v in args.remove.split(",") if v])
+    t0 = time.perf_counter()
+    table = dealer_table(rules, comp)
+    dt = time.perf_counter() - t0
+
+    print("up   " + " ".join(f"{k:>7}" for k in DEALER_OUTCOMES))
+    for up in list(range(2, 11)) + [1]:
+        label = "A" if up == 1 else str(up)
+        print(f"{label:<4} " + " ".join(f"{p:>7.4f}" for p in table[up]))
+    print(f"\n{dt * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+# farm.py
+# COUNTESS — parallel survival-run farm (simulation only).
+# Fans independent survival runs (seed sweeps and Rules / SurvivalEconomy / RunConfig grids)
+# out over a process pool and aggregates them into one summary table. Run seeds come from
+# np.random.SeedSequence.spawn, so results depend only on the root seed, never on the
+# worker count. Replicate r uses the same seed at every grid point (common random numbers).
+#
+# Run:
+#   python farm.py --runs 64 --hands 100000 --workers 8
+#   python farm.py --runs 32 --grid burn_per_hand=0.0005,0.002 --grid decks=6,8 --csv farm.csv
+#   python farm.py --runs 32 --grid bet_policy=flat,1-8
+
+from __future__ import annotations
+
+import argparse
+import csv
+import dataclasses
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine import (
+    BetPolicy,
+    HandStep,
+    Rules,
+    RunConfig,
+    Strategy,
+    SurvivalEconomy,
+    new_sim_state,
+    play_run,
+)
+
+
+@dataclass(frozen=True)
+class FarmJob:
+    index: int
+    replicate: int
+    label: str
+    cfg: RunConfig
+    rules: Rules
+    econ: SurvivalEconomy
+    seed: np.random.SeedSequence
+    # Optional player objects used instead of the ones cfg names (must pickle).
+    strategy: Optional[Strategy] = None
+    betting: Optional[BetPolicy] = None
+
+
+# =========================
+# ONE RUN
+# =========================
+def run_survival(job: FarmJob) -> dict:
+    # The app's per-hand step (engine.play_hand) without records; a bet policy scales
+    # cfg.base_bet per hand.
+    cfg = job.cfg
+    state = new_sim_state(cfg, job.rules, job.econ, job.seed, job.strategy, job.betting)
+    profit_sq = 0.0
+    wagered = 0.0
+
+    def on_hand(step: HandStep) -> None:
+        nonlocal profit_sq, wagered
+        rr = step[0]
+        profit_sq += rr.profit * rr.profit
+        wagered += rr.bet
+
+    status = play_run(state, on_hand)
+    hands = state["hand"]
+    bankroll = state["bankroll"]
+    return {
+        "run": job.index,
+        "replicate": job.replicate,
+        "label": job.label,
+        "status": status,
+        "hands": hands,
+        "hands_to_death": hands if status == "DEAD" else None,
+        "final_bankroll": bankroll,
+        "max_drawdown": state["max_drawdown"],
+        "refills": state["stats"].refills,
+        "final_credits": float(state["credits"].credits),
+        "profit": bankroll - float(cfg.initial_bankroll),
+        "profit_sq": profit_sq,
+        "wagered": wagered,
+    }
+
+
+# =========================
+# JOBS / POOL
+# =========================
+GridPoint = Tuple[str, RunConfig, Rules, SurvivalEconomy]
+
+
+def make_jobs(points: Sequence[GridPoint], runs: int, root_seed: int) -> List[FarmJob]:
+    seeds = np.random.SeedSequence(root_seed).spawn(runs)
+    jobs = []
+    for label, cfg, rules, econ in points:
+        for r in range(runs):
+            jobs.append(FarmJob(len(jobs), r, label, cfg, rules, econ, seeds[r]))
+    return jobs
+
+
+def _field_owners(cfg: RunConfig, rules: Rules, econ: SurvivalEconomy) -> Dict[str, Tuple[type, object]]:
+    # field name -> (owning dataclass, annotated type) over RunConfig / Rules / SurvivalEconomy.
+    owners = {}
+    for obj in (cfg, rules, econ):
+        for f in dataclasses.fields(obj):
+            owners[f.name] = (type(obj), f.type)
+    return owners
+
+
+def _apply_fields(
+    items: Sequence[Tuple[str, str]],
+    cfg: RunConfig,
+    rules: Rules,
+    econ: SurvivalEconomy,
+    owners: Optional[Dict[str, Tuple[type, object]]] = None,
+) -> Tuple[RunConfig, Rules, SurvivalEconomy]:
+    # (field, raw value) pairs parsed and applied to whichever dataclass owns each field.
+    owners = owners or _field_owners(cfg, rules, econ)
+    parts = {RunConfig: {}, Rules: {}, SurvivalEconomy: {}}
+    for key, raw in items:
+        if key not in owners:
+            raise ValueError(f"unknown field {key!r}")
+        cls, ftype = owners[key]
+        parts[cls][key] = _parse_field(raw, ftype)
+    return (
+        dataclasses.replace(cfg, **parts[RunConfig]),
+        dataclasses.replace(rules, **parts[Rules]),
+        dataclasses.replace(econ, **parts[SurvivalEconomy]),
+    )
+
+
+def parse_overrides(spec: str, cfg: RunConfig, rules: Rules, econ: SurvivalEconomy) -> Tuple[RunConfig, Rules, SurvivalEconomy]:
+    # "field=value,field=value" over RunConfig / Rules / SurvivalEconomy fields; an empty
+    # value is allowed (e.g. deviations=).
+    items = [item.partition("=")[::2] for item in filter(None, (x.strip() for x in spec.split(",")))]
+    return _apply_fields(items, cfg, rules, econ)
+
+
+def run_farm(jobs: Sequence[FarmJob], workers: Optional[int] = None) -> List[dict]:
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return [run_survival(j) for j in jobs]
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run_survival, jobs, chunksize=chunksize))
+
+
+def grid_points(
+    grid: Dict[str, Sequence[str]],
+    cfg: RunConfig,
+    rules: Rules,
+    econ: SurvivalEconomy,
+) -> List[GridPoint]:
+    # Each key names a field of RunConfig, Rules or SurvivalEconomy.
+    owners = _field_owners(cfg, rules, econ)
+    for key in grid:
+        if key not in owners:
+            raise ValueError(f"unknown grid field {key!r}")
+
+    points = []
+    keys = list(grid)
+    for combo in itertools.product(*(grid[k] for k in keys)):
+        label = " ".join(f"{k}={v}" for k, v in zip(keys, combo)) or "base"
+        points.append((label, *_apply_fields(list(zip(keys, combo)), cfg, rules, econ, owners)))
+    return points
+
+
+def _parse_field(raw: str, ftype) -> object:
+    name = ftype if isinstance(ftype, str) else getattr(ftype, "__name__", "str")
+    if name == "bool":
+        return raw.strip().lower() in ("1", "true", "yes", "on")
+    if name == "int":
+        return int(raw)
+    if name == "float":
+        return float(raw)
+    return raw
+
+
+# =========================
+# SUMMARY
+# =========================
+def _pct(values: np.ndarray, q: float) -> float:
+    return float(np.percentile(values, q)) if values.size else float("nan")
+
+
+def summarize(results: Sequence[dict]) -> List[dict]:
+    rows = []
+    labels = list(dict.fromkeys(r["label"] for r in results))
+    for label in labels:
+        rs = [r for r in results if r["label"] == label]
+        deaths = np.array([r["hands_to_death"] for r in rs if r["hands_to_death"] is not None], dtype=np.float64)
+        bank = np.array([r["final_bankroll"] for r in rs], dtype=np.float64)
+        dd = np.array([r["max_drawdown"] for r in rs], dtype=np.float64)
+        refills = np.array([r["refills"] for r in rs], dtype=np.float64)
+        rows.append({
+            "label": label,
+            "runs": len(rs),
+            "deaths": int(deaths.size),
+            "death_rate": deaths.size / max(1, len(rs)),
+            "broke": sum(1 for r in rs if r["status"] == "BROKE"),
+            "htd_median": _pct(deaths, 50),
+            "htd_p10": _pct(deaths, 10),
+            "bankroll_mean": float(bank.mean()),
+            "bankroll_p05": _pct(bank, 5),
+            "bankroll_p95": _pct(bank, 95),
+            "maxdd_mean": float(dd.mean()),
+            "maxdd_max": float(dd.max()),
+            "refills_mean": float(refills.mean()),
+            "refills_max": int(refills.max()),
+        })
+    return rows
+
+
+def format_table(rows: Sequence[dict]) -> str:
+    if not rows:
+        return "(no runs)"
+    cols = list(rows[0])
+
+    def cell(v) -> str:
+        if isinstance(v, float):
+            return "—" if np.isnan(v) else f"{v:.4g}" if abs(v) < 1e4 else f"{v:,.0f}"
+        return str(v)
+
+    body = [[cell(r[c]) for c in cols] for r in rows]
+    widths = [max(len(c), *(len(b[i]) for b in body)) for i, c in enumerate(cols)]
+    lines = ["  ".join(c.ljust(w) for c, w in zip(cols, widths))]
+    lines.append("  ".join("-" * w for w in widths))
+    lines += ["  ".join(v.ljust(w) for v, w in zip(b, widths)) for b in body]
+    return "\n".join(lines)
+
+
+def write_csv(path: str, rows: Sequence[dict]) -> None:
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=list(rows[0]))
+        w.writeheader()
+        w.writerows(rows)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="COUNTESS survival-run farm (simulation only)")
+    ap.add_argument("--runs", type=int, default=16, help="replicates per grid point")
+    ap.add_argument("--seed", type=int, default=RunConfig.seed, help="root seed for SeedSequence")
+    ap.add_argument("--hands", type=int, default=RunConfig.hands_cap, help="hands_cap per run")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--grid", action="append", default=[], metavar="FIELD=V1,V2",
+                    help="sweep a RunConfig / Rules / SurvivalEconomy field (repeatable)")
+    ap.add_argument("--csv", default="", help="write the summary table as CSV")
+    ap.add_argument("--runs-csv", default="", help="write one row per run as CSV")
+    args = ap.parse_args()
+
+    grid = {}
+    for spec in args.grid:
+        key, _, values = spec.partition("=")
+        grid[key.strip()] = [v for v in values.split(",") if v]
+
+    points = grid_points(grid, RunConfig(hands_cap=args.hands), Rules(), SurvivalEconomy())
+    jobs = make_jobs(points, args.runs, args.seed)
+
+    t0 = time.perf_counter()
+    results = run_farm(jobs, args.workers)
+    dt = time.perf_counter() - t0
+
+    rows = summarize(results)
+    print(format_table(rows))
+    total = sum(r["hands"] for r in results)
+    print(f"\n{len(results)} runs · {total:,} hands · {dt:.1f}s · {total / max(dt, 1e-9):,.0f} hands/sec")
+    if args.csv:
+        write_csv(args.csv, rows)
+    if args.runs_csv:
+        write_csv(args.runs_csv, results)
+
+
+if __name__ == "__main__":
+    main()
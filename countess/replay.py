@@ -0,0 +1,178 @@
+# replay.py
+# COUNTESS — seekable replay of a logged run (simulation only).
+# A run is deterministic from its config, so a replay index only needs sparse checkpoints:
+# one every K hands (checkpoint.capture, a few hundred bytes each). Seeking to hand n restores
+# the nearest checkpoint at or before it, fast-forwards through the trace-free play_round, and
+# plays hand n itself with a full trace for the table playback. The cost of a seek is bounded
+# by K trace-free hands, however long the run.
+#
+# An index is JSONL: a header line (config, rules, economy, K, hands) and one encoded
+# checkpoint per line. Built against the run's event log, every replayed hand is checked
+# against the logged profit, so an index never silently describes a different run.
+#
+# Run:
+#   python replay.py build --seed 7 --hands 1000000 --every 1000 --log logs/run.cols --out logs/run.replay.jsonl
+#   (build takes the same run options as `python -m countess run`: --decks, --h17, --burn, ...)
+#   python replay.py seek logs/run.replay.jsonl 654321
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import dataclasses
+import json
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from checkpoint import capture, decode, encode, restore
+from cli import add_run_arguments, run_setup
+from engine import RoundResult, Rules, RunConfig, SurvivalEconomy, new_sim_state, play_hand
+from runlog import load_events
+
+REPLAY_VERSION = 1
+
+
+class ReplayIndex:
+    def __init__(self, cfg: RunConfig, rules: Rules, econ: SurvivalEconomy, every: int, snapshots: Dict[int, dict]):
+        # The index replays on its own: no checkpoint file is written while seeking.
+        self.cfg = dataclasses.replace(cfg, checkpoint_path="")
+        self.rules = rules
+        self.econ = econ
+        self.every = int(every)
+        self.snapshots = snapshots
+        self._hands = sorted(snapshots)
+        self.hands = 0  # hands the indexed run played
+
+    @classmethod
+    def build(
+        cls,
+        cfg: RunConfig,
+        rules: Rules,
+        econ: SurvivalEconomy,
+        every: int = 1000,
+        log_path: Optional[str] = None,
+    ) -> "ReplayIndex":
+        # Plays the run once (until DEAD, broke or cfg.hands_cap), keeping a checkpoint before
+        # hand 1 and after every `every` hands. With log_path, each hand's profit must match
+        # the log's, otherwise ValueError (wrong seed, config or rules for that log).
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        logged = _logged_profits(log_path) if log_path else None
+        index = cls(cfg, rules, econ, every, {})
+        state = new_sim_state(index.cfg, rules, econ)
+        index.snapshots[0] = capture(state)
+        while True:
+            step = play_hand(state)
+            if step is None:
+                break
+            n = index.hands = state["hand"]
+            if logged is not None and n < logged.size and not np.isnan(logged[n]) and logged[n] != step[0].profit:
+                raise ValueError(f"hand {n:,}: log has profit {logged[n]:+.2f}, replay {step[0].profit:+.2f} — not this run")
+            if n % every == 0:
+                index.snapshots[n] = capture(state)
+        if logged is not None and index.hands < logged.size - 1:
+            raise ValueError(f"log runs to hand {logged.size - 1:,}, replay stopped at {index.hands:,} — not this run")
+        index._hands = sorted(index.snapshots)
+        return index
+
+    def seek(self, n: int) -> dict:
+        # Sim state right before hand n (1-based), i.e. after hand n - 1.
+        if not 1 <= n <= self.hands:
+            raise ValueError(f"hand {n:,} is outside 1..{self.hands:,}")
+        base = self._hands[bisect.bisect_right(self._hands, n - 1) - 1]
+        state = new_sim_state(self.cfg, self.rules, self.econ)
+        restore(state, self.snapshots[base])
+        while state["hand"] < n - 1:
+            play_hand(state)
+        return state
+
+    def replay(self, n: int) -> Tuple[dict, RoundResult, dict, dict]:
+        # Hand n with its trace: (state after the hand, round, trace payload, event record).
+        state = self.seek(n)
+        rr, payload, rec, _ = play_hand(state, verbose=True)
+        return state, rr, payload, rec
+
+    # =========================
+    # FILES
+    # =========================
+    def save(self, path: str) -> None:
+        header = {
+            "version": REPLAY_VERSION,
+            "every": self.every,
+            "hands": self.hands,
+            "cfg": dataclasses.asdict(self.cfg),
+            "rules": dataclasses.asdict(self.rules),
+            "econ": dataclasses.asdict(self.econ),
+        }
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        with open(p, "wb") as f:
+            f.write(json.dumps(header, separators=(",", ":")).encode("utf-8") + b"\n")
+            for n in self._hands:
+                f.write(encode(self.snapshots[n]) + b"\n")
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayIndex":
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != REPLAY_VERSION:
+                raise ValueError(f"replay index version {header.get('version')!r} is not {REPLAY_VERSION}")
+            snaps = [decode(line) for line in f if line.strip()]
+        index = cls(
+            RunConfig(**header["cfg"]),
+            Rules(**header["rules"]),
+            SurvivalEconomy(**header["econ"]),
+            header["every"],
+            {s["state"]["hand"]: s for s in snaps},
+        )
+        index.hands = int(header["hands"])
+        return index
+
+
+def _logged_profits(log_path: str) -> np.ndarray:
+    # Profit by hand number (NaN where the log has no record); a resumed run's repeats keep the last.
+    cols = load_events(log_path)
+    hands = np.asarray(cols["hand"], dtype=np.int64)
+    out = np.full(int(hands.max()) + 1 if hands.size else 1, np.nan)
+    out[hands] = np.asarray(cols["profit"], dtype=np.float64)
+    return out
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="COUNTESS replay index: sparse checkpoints and fast seek (simulation only)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="play a run once and write its replay index")
+    b.add_argument("--out", required=True)
+    b.add_argument("--every", type=int, default=1000, help="hands between checkpoints")
+    b.add_argument("--log", default="", help="the run's event log; every hand is checked against it")
+    add_run_arguments(b)
+    s = sub.add_parser("seek", help="replay one hand of an indexed run with its trace")
+    s.add_argument("index")
+    s.add_argument("hand", type=int)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.cmd == "build":
+        cfg, rules, econ = run_setup(args)
+        index = ReplayIndex.build(cfg, rules, econ, args.every, args.log or None)
+        index.save(args.out)
+        dt = time.perf_counter() - t0
+        print(f"{index.hands:,} hands · {len(index.snapshots):,} checkpoints -> {args.out} · {dt:.2f}s")
+        return
+
+    index = ReplayIndex.load(args.index)
+    t1 = time.perf_counter()
+    state, rr, payload, rec = index.replay(args.hand)
+    dt = time.perf_counter() - t1
+    print(f"hand {rec['hand']:,}: {rr.outcome} {rr.profit:+.2f}  bankroll={rec['bankroll']:.2f} credits={rec['credits']:.2f}")
+    print(f"dealer {' '.join(payload['dealer_cards_ui'])} · player " + " | ".join(" ".join(h) for h in payload["player_hands_ui"]))
+    for step in payload["trace"]:
+        print("  " + " ".join(f"{k}={v}" for k, v in step.items()))
+    print(f"seek {dt * 1000:.1f} ms (load {(t1 - t0) * 1000:.1f} ms, every={index.every:,})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+# runlog.py
+# COUNTESS — append-only columnar run log (simulation only).
+# A run directory ("<name>.cols") holds schema.json plus one raw little-endian file per
+# fixed-dtype column. Appends are plain byte writes of whole chunks, and every column
+# memory-maps straight back into NumPy, so analysis and replay never parse JSON.
+# Parquet export is available when pyarrow is installed.
+#
+# Run:
+#   python runlog.py convert logs/run.jsonl logs/run.cols
+#   python runlog.py info logs/run.cols
+#   python runlog.py parquet logs/run.cols logs/run.parquet
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+
+# Per-hand event record (same fields as the JSONL log), in column order.
+EVENT_COLUMNS = (
+    ("hand", "<i8"),
+    ("bankroll", "<f8"),
+    ("credits", "<f8"),
+    ("net_profit", "<f8"),
+    ("profit", "<f8"),
+    ("bet", "<f8"),
+    ("outcome", "i1"),         # index into OUTCOME_CODES
+    ("refill", "?"),
+    ("status", "i1"),          # index into STATUS_CODES
+    ("shoe_remaining", "<i4"),
+)
+OUTCOME_CODES = ("LOSE", "PUSH", "WIN", "BJ")
+STATUS_CODES = ("ALIVE", "DEAD")
+
+EVENT_DTYPE = np.dtype(list(EVENT_COLUMNS))
+
+SCHEMA_FILE = "schema.json"
+SCHEMA_VERSION = 1
+
+_OUTCOME_INDEX = {k: i for i, k in enumerate(OUTCOME_CODES)}
+_STATUS_INDEX = {k: i for i, k in enumerate(STATUS_CODES)}
+
+
+def encode_record(record: dict) -> tuple:
+    return (
+        int(record["hand"]),
+        float(record["bankroll"]),
+        float(record["credits"]),
+        float(record["net_profit"]),
+        float(record["profit"]),
+        float(record["bet"]),
+        _OUTCOME_INDEX[record["outcome"]],
+        bool(record["refill"]),
+        _STATUS_INDEX[record["status"]],
+        int(record.get("shoe_remaining") or 0),
+    )
+
+
+def decode_row(row: tuple) -> dict:
+    rec = dict(zip(EVENT_DTYPE.names, row))
+    rec["outcome"] = OUTCOME_CODES[rec["outcome"]]
+    rec["status"] = STATUS_CODES[rec["status"]]
+    return rec
+
+
+def decode_record(cols: Dict[str, np.ndarray], i: int) -> dict:
+    return decode_row(tuple(cols[name][i].item() for name, _ in EVENT_COLUMNS))
+
+
+# =========================
+# IN-MEMORY WINDOW
+# =========================
+class EventRing:
+    # Fixed-capacity, array-backed window of the most recent event records. Memory stays
+    # flat however long the run is; indexing and iteration yield decoded dicts (oldest first).
+    def __init__(self, capacity: int = 2048):
+        self.capacity = max(1, int(capacity))
+        self._buf = np.zeros(self.capacity, dtype=EVENT_DTYPE)
+        self.total = 0  # records ever appended
+
+    def append(self, record: dict) -> None:
+        self._buf[self.total % self.capacity] = encode_record(record)
+        self.total += 1
+
+    def __len__(self) -> int:
+        return min(self.total, self.capacity)
+
+    def _slot(self, i: int) -> int:
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("event index out of range")
+        return (self.total - n + i) % self.capacity
+
+    def __getitem__(self, i: int) -> dict:
+        return decode_row(self._buf[self._slot(i)].item())
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def columns(self, last: Optional[int] = None) -> Dict[str, np.ndarray]:
+        # Copy of the newest `last` records (default: the whole window) in order.
+        n = len(self) if last is None else max(0, min(int(last), len(self)))
+        idx = (np.arange(self.total - n, self.total)) % self.capacity
+        rows = self._buf[idx]
+        return {name: rows[name] for name, _ in EVENT_COLUMNS}
+
+    def tail(self, last: int) -> List[dict]:
+        n = max(0, min(int(last), len(self)))
+        return [self[i] for i in range(len(self) - n, len(self))]
+
+
+# =========================
+# WRITER
+# =========================
+class ColumnarLog:
+    # Same write/flush/close interface as engine.EventWriter. Records fill preallocated
+    # chunk arrays; a full chunk (or one older than max_age_s) is appended to the column files.
+    def __init__(self, path: str, chunk: int = 4096, max_age_s: float = 2.0):
+        self.path = Path(path)
+        self.chunk = max(1, int(chunk))
+        self.max_age_s = float(max_age_s)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._check_schema()
+        self._buf = np.empty(self.chunk, dtype=EVENT_DTYPE)
+        self._n = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _check_schema(self) -> None:
+        schema_path = self.path / SCHEMA_FILE
+        schema = {
+            "version": SCHEMA_VERSION,
+            "columns": [list(c) for c in EVENT_COLUMNS],
+            "outcome_codes": list(OUTCOME_CODES),
+            "status_codes": list(STATUS_CODES),
+        }
+        if schema_path.exists():
+            old = json.loads(schema_path.read_text(encoding="utf-8"))
+            if old.get("columns") != schema["columns"]:
+                raise ValueError(f"{self.path}: existing run log has a different column schema")
+            return
+        schema_path.write_text(json.dumps(schema, indent=2), encoding="utf-8")
+
+    def write(self, record: dict) -> None:
+        row = encode_record(record)
+        with self._lock:
+            self._buf[self._n] = row
+            self._n += 1
+            if self._n >= self.chunk or time.monotonic() - self._last_flush >= self.max_age_s:
+                self._flush_locked()
+
+    def flush(self, stale_only: bool = False) -> None:
+        with self._lock:
+            if stale_only and time.monotonic() - self._last_flush < self.max_age_s:
+                return
+            self._flush_locked()
+
+    def close(self) -> None:
+        self.flush()
+
+    def _flush_locked(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._n:
+            return
+        rows = self._buf[: self._n]
+        for name, _ in EVENT_COLUMNS:
+            with open(self.path / f"{name}.bin", "ab") as f:
+                f.write(np.ascontiguousarray(rows[name]).tobytes())
+        self._n = 0
+
+
+# =========================
+# READER
+# =========================
+def load_columnar(path: str, mmap: bool = True) -> Dict[str, np.ndarray]:
+    # Columns are truncated to the shortest one, so a run cut off mid-flush still loads.
+    root = Path(path)
+    schema = json.loads((root / SCHEMA_FILE).read_text(encoding="utf-8"))
+    cols: Dict[str, np.ndarray] = {}
+    for name, dtype in schema["columns"]:
+        f = root / f"{name}.bin"
+        dt = np.dtype(dtype)
+        size = f.stat().st_size if f.exists() else 0
+        if size < dt.itemsize:
+            cols[name] = np.empty(0, dtype=dt)
+        elif mmap:
+            cols[name] = np.memmap(f, dtype=dt, mode="r", shape=(size // dt.itemsize,))
+        else:
+            cols[name] = np.fromfile(f, dtype=dt)
+    n = min((len(c) for c in cols.values()), default=0)
+    return {k: v[:n] for k, v in cols.items()}
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def jsonl_to_columnar(src: str, dst: str, chunk: int = 65536, force: bool = False) -> int:
+    # Accepts plain or .gz JSONL from EventWriter / append_jsonl. ColumnarLog appends, so an
+    # existing run log at dst is refused (FileExistsError), or replaced with force.
+    root = Path(dst)
+    if root.is_dir() and any(root.iterdir()):
+        if not force:
+            raise FileExistsError(f"{dst} already holds a run log (use --force to replace it)")
+        for name in [SCHEMA_FILE, *(f"{c}.bin" for c, _ in EVENT_COLUMNS)]:
+            (root / name).unlink(missing_ok=True)
+    log = ColumnarLog(dst, chunk=chunk, max_age_s=float("inf"))
+    n = 0
+    for rec in iter_jsonl(src):
+        log.write(rec)
+        n += 1
+    log.close()
+    return n
+
+
+def columnar_to_parquet(src: str, dst: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from e
+    cols = load_columnar(src, mmap=False)
+    table = pa.table({k: pa.array(v) for k, v in cols.items()})
+    pq.write_table(table, dst)
+    return table.num_rows
+
+
+def load_events(path: str) -> Dict[str, np.ndarray]:
+    # Columns from a .cols run log, a .parquet export or a (gzipped) JSONL log.
+    p = str(path)
+    if p.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(p)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    if Path(p).is_dir():
+        return load_columnar(p)
+    rows: List[tuple] = [encode_record(r) for r in iter_jsonl(p)]
+    arr = np.array(rows, dtype=EVENT_DTYPE)
+    return {name: arr[name] for name, _ in EVENT_COLUMNS}
+
+
+def _describe(cols: Dict[str, np.ndarray]) -> Iterable[str]:
+    n = len(cols["hand"])
+    yield f"hands: {n:,}"
+    if not n:
+        return
+    yield f"hand range: {int(cols['hand'][0])} .. {int(cols['hand'][-1])}"
+    yield f"final bankroll: {float(cols['bankroll'][-1]):.2f}  credits: {float(cols['credits'][-1]):.2f}"
+    yield f"mean profit: {float(np.mean(cols['profit'])):+.5f}  refills: {int(np.count_nonzero(cols['refill']))}"
+    counts = np.bincount(np.asarray(cols["outcome"], dtype=np.int64), minlength=len(OUTCOME_CODES))
+    yield "outcomes: " + " ".join(f"{k}={int(c)}" for k, c in zip(OUTCOME_CODES, counts))
+    yield f"status: {STATUS_CODES[int(cols['status'][-1])]}"
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(description="COUNTESS columnar run log tools (simulation only)")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("convert", help="JSONL (or .jsonl.gz) event log -> .cols run log")
+    c.add_argument("src")
+    c.add_argument("dst")
+    c.add_argument("--force", action="store_true", help="replace an existing run log at dst")
+    i = sub.add_parser("info", help="summarise a run log (.cols, .parquet or JSONL)")
+    i.add_argument("src")
+    p = sub.add_parser("parquet", help=".cols run log -> Parquet (needs pyarrow)")
+    p.add_argument("src")
+    p.add_argument("dst")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "convert":
+        try:
+            n = jsonl_to_columnar(args.src, args.dst, force=args.force)
+        except FileExistsError as e:
+            ap.error(str(e))
+        print(f"{n:,} records -> {args.dst}")
+    elif args.cmd == "parquet":
+        print(f"{columnar_to_parquet(args.src, args.dst):,} rows -> {args.dst}")
+    else:
+        for line in _describe(load_events(args.src)):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
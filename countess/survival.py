@@ -0,0 +1,566 @@
+# survival.py
+# COUNTESS — analytical SurvivalEconomy solver (simulation only).
+# CreditManager.step is deterministic given a hand's profit (burn, tax on positive profit,
+# refill, death check), so with i.i.d. per-hand profits the credit balance is a Markov chain.
+# The solver runs it as dynamic programming over credit levels in the burn-free frame
+# y = credits + hands * burn_per_hand: there a hand only ever moves y up (by the taxed profit)
+# and the refill/death thresholds rise by burn_per_hand per hand. Levels out of the
+# threshold's reach only convolve with the jump distribution (FFT powers for long stretches);
+# the strip it can reach goes through a cached linear map per block of hands.
+# Hands-to-death is exact on the lattice; the refill-count distribution is read off its
+# generating function evaluated at roots of unity. Per-hand profit histograms come from
+# vecsim or from a run log.
+#
+# replay_economy is the exact counterpart for one concrete profit path: bankroll, drawdown
+# and credits for any number of economies from cumulative sums, bit-identical to the
+# per-hand loop in farm.run_survival.
+#
+# Shoe-level correlation between hands is ignored; use farm.py to cross-check a point.
+#
+# Run:
+#   python survival.py --hands 500000
+#   python survival.py --grid burn_per_hand=0.01,0.02 --grid tax_rate_on_positive_profit=0.02
+#   python survival.py --log logs/run.cols --hands 200000
+#   python survival.py --replay --hands 500000 --grid refill_amount=5,10,20 --grid burn_per_hand=0.001,0.01
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from fractions import Fraction
+from math import gcd
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from engine import Rules, RunConfig, SurvivalEconomy
+from farm import format_table, grid_points
+from runlog import load_events
+
+
+# =========================
+# PROFIT DISTRIBUTION
+# =========================
+@dataclass(frozen=True)
+class ProfitDistribution:
+    values: np.ndarray  # distinct per-hand profits, ascending
+    probs: np.ndarray   # matching probabilities (sum to 1)
+
+    @classmethod
+    def from_samples(cls, profits: np.ndarray) -> "ProfitDistribution":
+        values, counts = np.unique(np.round(np.asarray(profits, dtype=np.float64), 9), return_counts=True)
+        return cls(values, counts / counts.sum())
+
+    @property
+    def mean(self) -> float:
+        return float(self.values @ self.probs)
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(((self.values - self.mean) ** 2) @ self.probs))
+
+
+def engine_profit_distribution(
+    rules: Rules,
+    bet: float = 1.0,
+    shoes: int = 2000,
+    rounds: int = 500,
+    seed: int = 7,
+) -> ProfitDistribution:
+    from vecsim import simulate
+
+    return ProfitDistribution.from_samples(simulate(rules, shoes, rounds, seed=seed, bet=bet).profit)
+
+
+def log_profit_distribution(path: str) -> ProfitDistribution:
+    return ProfitDistribution.from_samples(load_events(path)["profit"])
+
+
+# =========================
+# CREDIT LATTICE
+# =========================
+@dataclass
+class SurvivalSolution:
+    hands: int
+    death_hands: np.ndarray            # hands at which some probability mass dies, ascending
+    p_dead: np.ndarray                 # P(DEAD by death_hands[i])
+    p_alive: float                     # P(still ALIVE after `hands` hands)
+    refills_mean: float                # E[refills in `hands` hands]
+    refills_std: float
+    refills_pmf: Optional[np.ndarray]  # P(refills == k); None when the support is too wide
+    step: float                        # lattice spacing in credits
+    exact: bool                        # every jump, refill and start level lies on the lattice
+
+    @property
+    def p_dead_total(self) -> float:
+        return float(self.p_dead[-1]) if self.p_dead.size else 0.0
+
+    def death_quantile(self, q: float) -> Optional[int]:
+        # First hand by which P(DEAD) >= q.
+        i = int(np.searchsorted(self.p_dead, q - 1e-12))
+        return int(self.death_hands[i]) if i < self.p_dead.size else None
+
+    def summary(self) -> dict:
+        p = self.p_dead_total
+        out = {
+            "hands": self.hands,
+            "p_dead": p,
+            # hands-to-death among runs that die within `hands` (farm.py's htd_* columns)
+            "htd_median": self.death_quantile(0.5 * p) if p > 0 else None,
+            "htd_p10": self.death_quantile(0.1 * p) if p > 0 else None,
+            "p_alive": self.p_alive,
+            "refills_mean": self.refills_mean,
+            "refills_std": self.refills_std,
+            "refills_p50": None,
+            "refills_p95": None,
+            "exact": self.exact,
+        }
+        if self.refills_pmf is not None:
+            cdf = np.cumsum(self.refills_pmf)
+            out["refills_p50"] = int(np.searchsorted(cdf, 0.5))
+            out["refills_p95"] = int(np.searchsorted(cdf, 0.95))
+        return out
+
+
+def _lattice_step(values: Sequence[float], limit: int = 1000) -> float:
+    # Largest spacing that puts every value (approximately) on a common lattice.
+    fracs = [Fraction(float(v)).limit_denominator(limit) for v in values if v > 0]
+    if not fracs:
+        return 0.0
+    g = fracs[0]
+    for f in fracs[1:]:
+        g = Fraction(gcd(g.numerator * f.denominator, f.numerator * g.denominator), g.denominator * f.denominator)
+    return float(g)
+
+
+def _on_lattice(x: float, h: float) -> bool:
+    return abs(x / h - round(x / h)) < 1e-6
+
+
+class CreditLattice:
+    # Level i is y = initial_credits + i*step. A level is "caught" at the first hand t whose
+    # threshold max(refill_threshold, death_threshold) + t*burn reaches it; caught mass refills
+    # (moves up by refill_amount) and/or dies exactly as CreditManager.step would. Levels above
+    # the horizon's final threshold can never be caught and count as escaped. Only the window
+    # of levels that still holds non-negligible mass is kept.
+    def __init__(
+        self,
+        econ: SurvivalEconomy,
+        dist: ProfitDistribution,
+        horizon: int,
+        step: Optional[float] = None,
+        block: int = 32,
+        tol: float = 1e-13,
+        max_kernel: int = 512,
+    ):
+        self.econ = econ
+        self.dist = dist
+        self.horizon = int(horizon)
+        self.block = max(1, int(block))
+        self.tol = float(tol)
+        tax = float(econ.tax_rate_on_positive_profit)
+        jumps = [tax * float(p) for p in dist.values if p > 0] if tax > 0 else []
+
+        self.floor = max(econ.refill_threshold, econ.death_threshold)
+        top = self.floor + self.horizon * econ.burn_per_hand  # never caught above this
+        span = max(0.0, top - econ.initial_credits)
+
+        h = float(step) if step else _lattice_step(jumps + [econ.refill_amount])
+        if h <= 0:
+            h = max(jumps, default=1.0) / 16
+        if max(jumps, default=0.0) / h > max_kernel:
+            h = max(jumps) / max_kernel
+        self.step = h
+        self.levels = int(np.floor(span / h + 1e-9)) + 1
+        self.exact = all(_on_lattice(x, h) for x in jumps + [econ.refill_amount])
+        # refill_amount in levels: whole part, and the share that lands one level higher
+        self.refill_levels = int(np.floor(econ.refill_amount / h + 1e-9))
+        self.refill_frac = max(0.0, econ.refill_amount / h - self.refill_levels)
+
+        # Per-hand jump distribution on the lattice (off-lattice jumps split between neighbours).
+        kernel = np.zeros(int(np.ceil(max(jumps, default=0.0) / h)) + 2)
+        for p, value in zip(dist.probs, dist.values):
+            pos = tax * float(value) / h if value > 0 else 0.0
+            k = int(np.floor(pos + 1e-9))
+            frac = max(0.0, pos - k)
+            kernel[k] += p * (1.0 - frac)
+            kernel[k + 1] += p * frac
+        self.kernel = np.trim_zeros(kernel, "b")
+        self._powers: Dict[int, np.ndarray] = {1: self.kernel}
+        self._blocks: Dict[Tuple[float, int], tuple] = {}
+
+    def _kernel(self, hands: int) -> np.ndarray:
+        # Jump distribution over `hands` hands, by FFT exponentiation, negligible tail dropped.
+        if hands not in self._powers:
+            full = (len(self.kernel) - 1) * hands + 1
+            n = 1 << int(np.ceil(np.log2(max(2, full))))
+            k = np.clip(np.fft.irfft(np.fft.rfft(self.kernel, n) ** hands, n)[:full], 0.0, None)
+            tail = np.cumsum(k[::-1])
+            self._powers[hands] = k[: full - int(np.searchsorted(tail, self.tol * 1e-3))]
+        return self._powers[hands]
+
+    def _caught_below(self, phi: float, hands: int) -> int:
+        # Levels (relative to one whose balance is `phi`) caught within the next `hands` hands.
+        b = self.econ.burn_per_hand
+        return max(0, int(np.floor((self.floor - phi + hands * b) / self.step + 1e-9)) + 1)
+
+    def _block_map(self, phi: float, hands: int) -> tuple:
+        # Linear map of the lowest levels over `hands` hands, built by running CreditManager's
+        # rules on unit masses: maps[r] takes the strip to where it ends up after exactly r
+        # refills (offset r*refill_levels), deaths[r][:, s] is what dies at hand s+1 after r.
+        # Depends only on the balance `phi` of the strip's first level, so blocks are cached.
+        key = (round(phi / self.step, 7), hands)
+        if key in self._blocks:
+            return self._blocks[key]
+        econ, h, b = self.econ, self.step, self.econ.burn_per_hand
+        eps = 1e-9 * h
+        q, f = self.refill_levels, self.refill_frac
+        S = self._caught_below(phi, hands)
+        maps = [np.eye(S)]
+        deaths = [np.zeros((S, hands))]
+        for s in range(1, hands + 1):
+            maps = [_convolve_rows(m, self.kernel) for m in maps]
+            landed: Dict[int, List[tuple]] = {}
+            for r, m in enumerate(maps):
+                n = min(m.shape[1], self._caught_below(phi - s * b, 0) - r * q)
+                if n <= 0:
+                    continue
+                j = np.arange(n)
+                c = phi + (r * q + j) * h - s * b
+                refill = c <= econ.refill_threshold + eps
+                dead = np.where(refill, c + econ.refill_amount, c) <= econ.death_threshold + eps
+                deaths[r][:, s - 1] += m[:, :n][:, dead].sum(axis=1)
+                back = refill & ~dead
+                if back.any():
+                    landed.setdefault(r + 1, []).append((j[back], m[:, :n][:, back].copy()))
+                m[:, :n] = 0.0
+            for r, parts in landed.items():
+                if r == len(maps):
+                    maps.append(np.zeros((S, 0)))
+                    deaths.append(np.zeros((S, hands)))
+                for j, mass in parts:
+                    width = int(j.max()) + 2
+                    if maps[r].shape[1] < width:
+                        maps[r] = np.pad(maps[r], ((0, 0), (0, width - maps[r].shape[1])))
+                    np.add.at(maps[r], (slice(None), j), mass * (1.0 - f))
+                    np.add.at(maps[r], (slice(None), j + 1), mass * f)
+        out = (S, maps, deaths)
+        if len(self._blocks) >= 512:
+            self._blocks.clear()
+        self._blocks[key] = out
+        return out
+
+    def refill_bound(self) -> int:
+        # Refills within the horizon are at most this many: between two refills the balance
+        # has to fall by more than refill_amount - (refill_threshold - death_threshold).
+        econ = self.econ
+        if econ.burn_per_hand <= 0:
+            return 1
+        gap = econ.death_threshold + econ.refill_amount - econ.refill_threshold
+        per = int(gap // econ.burn_per_hand) if gap > econ.burn_per_hand else 1
+        return min(self.horizon, 1 + self.horizon // max(1, per))
+
+    def solve(self, refill_dist: bool = True, max_refill_support: int = 64) -> SurvivalSolution:
+        death_hands, p_dead, moments = self._propagate(1)
+        mean = float(moments[1])
+        var = max(0.0, float(moments[2]) + mean - mean * mean)
+
+        # P(refills = n) from the generating function at K roots of unity. That gives the counts
+        # mod K, so K only has to span the spread (~12 std) and the window is unwrapped around
+        # the mean -- unless K covers every count the horizon allows.
+        pmf = None
+        if refill_dist and mean < self.tol:
+            pmf = np.ones(1)
+        elif refill_dist:
+            bound = self.refill_bound()
+            K = 1 << int(np.ceil(np.log2(max(2.0, min(bound + 1, 12 * np.sqrt(var) + 8)))))
+            if K <= max_refill_support:
+                G = self._propagate(K)[2]
+                G = np.concatenate([G, np.conj(G[1:K - len(G) + 1][::-1])])
+                wrapped = np.clip(np.fft.fft(G).real / K, 0.0, None)
+                offset = 0 if bound < K else max(0, int(round(mean)) - K // 2)
+                pmf = np.trim_zeros(np.concatenate([np.zeros(offset), np.roll(wrapped, -offset)]), "b")
+
+        dead_total = float(p_dead[-1]) if p_dead else 0.0
+        return SurvivalSolution(
+            hands=self.horizon,
+            death_hands=np.array(death_hands, dtype=np.int64),
+            p_dead=np.array(p_dead),
+            p_alive=max(0.0, 1.0 - dead_total),
+            refills_mean=mean,
+            refills_std=float(np.sqrt(var)),
+            refills_pmf=pmf,
+            step=self.step,
+            exact=self.exact,
+        )
+
+    def _propagate(self, K: int):
+        # One pass over the horizon. With K == 1 the rows are P, E[N] and E[N(N-1)] per level
+        # (N = refills so far); otherwise row m weighs every refill by z_m = exp(2*pi*i*m/K),
+        # sampling the refill-count generating function. Row 0 is the distribution itself.
+        econ = self.econ
+        rows = K // 2 + 1 if K > 1 else 3
+        z = np.exp(2j * np.pi * np.arange(rows) / K)
+        dtype = np.complex128 if K > 1 else np.float64
+
+        def refilled(x: np.ndarray, r: int) -> np.ndarray:
+            # rows after r more refills
+            if K > 1:
+                return x * (z ** r)[:, None]
+            return np.stack([x[0], x[1] + r * x[0], x[2] + 2 * r * x[1] + r * (r - 1) * x[0]])
+
+        h, b = self.step, econ.burn_per_hand
+        base = 0                               # level of w[:, 0]
+        w = np.zeros((rows, 1), dtype=dtype)   # window of live mass
+        w[:, 0] = 1.0 if K > 1 else (1.0, 0.0, 0.0)
+        settled = np.zeros(rows, dtype=dtype)  # mass that left the window, refill-weighted
+        death_hands: List[int] = []
+        p_dead: List[float] = []
+        dead_total = 0.0
+
+        t = 0
+        while t < self.horizon:
+            # jump straight to the hand before the lowest live level can first be caught
+            phi = econ.initial_credits + base * h - t * b
+            if b > 0:
+                skip = max(0, int(np.ceil((phi - self.floor) / b - 1e-9)) - 1)
+            else:
+                skip = 0 if phi <= self.floor + 1e-9 * h else self.horizon
+            skip = min(skip, self.horizon - t)
+            if skip:
+                w = _convolve_rows(w, self._kernel(skip))
+                t += skip
+                phi -= skip * b
+            hands = min(self.block, self.horizon - t)
+            if hands:
+                S, maps, deaths = self._block_map(phi, hands)
+                strip = w[:, :S]
+                if strip.shape[1] < S:
+                    strip = np.pad(strip, ((0, 0), (0, S - strip.shape[1])))
+                upper = _convolve_rows(w[:, S:], self._kernel(hands)) if w.shape[1] > S else w[:, :0]
+                width = S + upper.shape[1]
+                for r, m in enumerate(maps):
+                    width = max(width, r * self.refill_levels + m.shape[1])
+                nxt = np.zeros((rows, width), dtype=dtype)
+                nxt[:, S:S + upper.shape[1]] = upper
+                died = np.zeros((rows, hands), dtype=dtype)
+                for r, (m, d) in enumerate(zip(maps, deaths)):
+                    x = refilled(strip, r)
+                    off = r * self.refill_levels
+                    nxt[:, off:off + m.shape[1]] += x @ m
+                    died += x @ d
+                w = nxt
+                t += hands
+                settled += died.sum(axis=1)
+                for s in np.flatnonzero(np.abs(died[0]) > 0):
+                    dead_total += float(died[0, s].real)
+                    death_hands.append(t - hands + int(s) + 1)
+                    p_dead.append(dead_total)
+
+            # drop what escaped the horizon's reach and the negligible upper tail
+            keep = min(w.shape[1], self.levels - base)
+            tail = np.cumsum(np.abs(w[0, :keep])[::-1])
+            keep -= int(np.searchsorted(tail, self.tol))
+            settled += w.sum(axis=1) - w[:, :keep].sum(axis=1)
+            w = w[:, :keep]
+            live = np.flatnonzero(np.abs(w[0]) > 0)
+            if not live.size or float(np.abs(w[0]).sum()) < self.tol:
+                settled += w.sum(axis=1)
+                w = w[:, :0]
+                break
+            w = w[:, live[0]:]
+            base += int(live[0])
+
+        return death_hands, p_dead, w.sum(axis=1) + settled
+
+
+def _convolve_rows(v: np.ndarray, k: np.ndarray) -> np.ndarray:
+    if len(k) == 1:
+        return v * k[0]
+    if len(k) <= 32:
+        out = np.zeros((v.shape[0], v.shape[1] + len(k) - 1), dtype=v.dtype)
+        for j, kj in enumerate(k):
+            if kj:
+                out[:, j:j + v.shape[1]] += kj * v
+        return out
+    n = v.shape[1] + len(k) - 1
+    size = 1 << int(np.ceil(np.log2(n)))
+    if np.iscomplexobj(v):
+        return np.fft.ifft(np.fft.fft(v, size) * np.fft.fft(k, size), size)[:, :n]
+    return np.clip(np.fft.irfft(np.fft.rfft(v, size) * np.fft.rfft(k, size), size)[:, :n], 0.0, None)
+
+
+def solve_survival(
+    econ: SurvivalEconomy,
+    dist: ProfitDistribution,
+    hands: int,
+    step: Optional[float] = None,
+    refill_dist: bool = True,
+) -> SurvivalSolution:
+    return CreditLattice(econ, dist, hands, step=step).solve(refill_dist=refill_dist)
+
+
+# =========================
+# PROFIT-PATH REPLAY
+# =========================
+@dataclass(frozen=True)
+class ProfitPath:
+    # One per-hand profit series with the parts every economy shares: the bankroll after each
+    # hand, its running max drawdown and the hand at which the bankroll first hits zero.
+    profits: np.ndarray
+    bankroll: np.ndarray      # bankroll[i] after i hands (bankroll[0] is the starting bankroll)
+    max_drawdown: np.ndarray  # max drawdown over the first i hands
+    broke_after: int          # hands played before the bankroll can no longer cover a bet
+
+    @classmethod
+    def from_profits(cls, profits: np.ndarray, initial_bankroll: float) -> "ProfitPath":
+        profits = np.ascontiguousarray(profits, dtype=np.float64)
+        # add.accumulate is a left fold, so every partial sum matches `bankroll += profit`
+        bankroll = np.add.accumulate(np.concatenate(([float(initial_bankroll)], profits)))
+        dd = np.maximum.accumulate(bankroll) - bankroll
+        broke = np.flatnonzero(bankroll[:-1] <= 0)
+        return cls(
+            profits,
+            bankroll,
+            np.maximum.accumulate(dd),
+            int(broke[0]) if broke.size else len(profits),
+        )
+
+    @property
+    def hands(self) -> int:
+        return len(self.profits)
+
+
+def replay_economy(path: ProfitPath, econ: SurvivalEconomy, chunk: int = 65536) -> dict:
+    # CreditManager.step over the whole path, with the same result fields as farm.run_survival.
+    # Credits between refill/death events are one cumulative sum per chunk; the interleaved
+    # (-burn, +tax) series reproduces the scalar float operations exactly. Only the hands that
+    # cross max(refill_threshold, death_threshold) are applied one at a time.
+    burn = float(econ.burn_per_hand)
+    tax = float(econ.tax_rate_on_positive_profit)
+    floor = max(econ.refill_threshold, econ.death_threshold)
+    end = path.broke_after
+
+    credits = float(econ.initial_credits)
+    refills = 0
+    status = "ALIVE"
+    i = 0
+    while i < end:
+        # the balance falls by at most `burn` per hand, so no event can happen for `safe` hands
+        if credits <= floor:
+            safe = 0
+        else:
+            safe = int((credits - floor) / burn) if burn > 0 else chunk
+        n = min(end - i, max(256, min(chunk, 2 * safe)))
+        seq = np.empty(2 * n + 1)
+        seq[0] = credits
+        seq[1::2] = -burn
+        seq[2::2] = np.where(path.profits[i:i + n] > 0, path.profits[i:i + n] * tax, 0.0)
+        after = np.add.accumulate(seq)[2::2]
+        hit = np.flatnonzero(after <= floor)
+        if not hit.size:
+            credits = float(after[-1])
+            i += n
+            continue
+
+        k = int(hit[0])
+        credits = float(after[k])
+        i += k + 1
+        if credits <= econ.refill_threshold:
+            credits += econ.refill_amount
+            refill = True
+        else:
+            refill = False
+        if credits <= econ.death_threshold:
+            status = "DEAD"
+            break
+        refills += refill
+
+    if status == "ALIVE" and end < path.hands:
+        status = "BROKE"
+    hands = i if status == "DEAD" else end
+    return {
+        "status": status,
+        "hands": hands,
+        "hands_to_death": hands if status == "DEAD" else None,
+        "final_bankroll": float(path.bankroll[hands]),
+        "max_drawdown": float(path.max_drawdown[hands]),
+        "refills": refills,
+        "final_credits": credits,
+    }
+
+
+def replay_grid(path: ProfitPath, econs: Sequence[SurvivalEconomy]) -> List[dict]:
+    return [replay_economy(path, econ) for econ in econs]
+
+
+def engine_profit_path(rules: Rules, hands: int, bet: float = 1.0, shoes: int = 64, seed: int = 7) -> np.ndarray:
+    # `hands` per-hand profits from vecsim: each shoe's rounds in order, shoes back to back.
+    from vecsim import simulate
+
+    rounds = -(-int(hands) // shoes)
+    return simulate(rules, shoes, rounds, seed=seed, bet=bet).profit.T.ravel()[:hands]
+
+
+# =========================
+# CLI
+# =========================
+def main():
+    ap = argparse.ArgumentParser(description="COUNTESS analytical survival solver (simulation only)")
+    ap.add_argument("--hands", type=int, default=RunConfig.hands_cap, help="horizon in hands")
+    ap.add_argument("--grid", action="append", default=[], metavar="FIELD=V1,V2",
+                    help="sweep a RunConfig / Rules / SurvivalEconomy field (repeatable)")
+    ap.add_argument("--step", type=float, default=None, help="credit lattice spacing (default: from tax * profits)")
+    ap.add_argument("--log", default="", help="take the profit histogram from a run log instead of vecsim")
+    ap.add_argument("--shoes", type=int, default=2000, help="vecsim shoes for the profit histogram")
+    ap.add_argument("--rounds", type=int, default=500, help="vecsim rounds for the profit histogram")
+    ap.add_argument("--seed", type=int, default=RunConfig.seed)
+    ap.add_argument("--no-refill-dist", action="store_true", help="skip the refill-count distribution (mean and std only)")
+    ap.add_argument("--replay", action="store_true",
+                    help="replay one profit path (vecsim, or --log) through every grid point instead of solving")
+    args = ap.parse_args()
+
+    grid = {}
+    for spec in args.grid:
+        key, _, values = spec.partition("=")
+        grid[key.strip()] = [v for v in values.split(",") if v]
+    points = grid_points(grid, RunConfig(hands_cap=args.hands), Rules(), SurvivalEconomy())
+
+    dists: Dict[tuple, ProfitDistribution] = {}
+    paths: Dict[tuple, ProfitPath] = {}
+    rows = []
+    t0 = time.perf_counter()
+    for label, cfg, rules, econ in points:
+        if args.replay:
+            key = (rules, cfg.base_bet, cfg.hands_cap, cfg.initial_bankroll)
+            if key not in paths:
+                profits = (
+                    load_events(args.log)["profit"][: cfg.hands_cap] if args.log
+                    else engine_profit_path(rules, cfg.hands_cap, cfg.base_bet, seed=args.seed)
+                )
+                paths[key] = ProfitPath.from_profits(profits, cfg.initial_bankroll)
+            row = {"label": label}
+            for k, v in replay_economy(paths[key], econ).items():
+                row[k] = float("nan") if v is None else v
+            rows.append(row)
+            continue
+        key = (rules, cfg.base_bet)
+        if key not in dists:
+            dists[key] = (
+                log_profit_distribution(args.log) if args.log
+                else engine_profit_distribution(rules, cfg.base_bet, args.shoes, args.rounds, args.seed)
+            )
+        sol = solve_survival(econ, dists[key], cfg.hands_cap, args.step, not args.no_refill_dist)
+        row = {"label": label}
+        for k, v in sol.summary().items():
+            row[k] = float("nan") if v is None else v
+        rows.append(row)
+    dt = time.perf_counter() - t0
+
+    print(format_table(rows))
+    print(f"\n{len(rows)} points · {dt:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
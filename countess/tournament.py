@@ -0,0 +1,151 @@
+# tournament.py
+# COUNTESS — strategy / bet-policy tournament under common random numbers (simulation only).
+# Every entrant plays the same replicate seeds (farm.make_jobs), so replicate r deals the same
+# shoe orders to all of them and the luck of the cards is shared. Differences against the
+# reference entrant are averaged per replicate; the paired standard error is usually far below
+# the unpaired one, which is the point: the same confidence for a fraction of the hands.
+#
+# Run:
+#   python tournament.py --runs 32 --hands 50000
+#   python tournament.py --entrant "basic=" --entrant "hilo 1-8=bet_policy=1-8" \
+#       --entrant "hilo 1-8 i18=bet_policy=1-8,deviations=i18" --entrant "optimal=strategy_path=optimal"
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from engine import BetPolicy, Rules, RunConfig, Strategy, SurvivalEconomy, make_env
+from farm import FarmJob, format_table, make_jobs, parse_overrides, run_farm, write_csv
+
+
+@dataclass(frozen=True)
+class Entrant:
+    label: str
+    cfg: RunConfig
+    rules: Rules
+    econ: SurvivalEconomy
+    # Player objects instead of the ones cfg names; they are pickled to the workers.
+    strategy: Optional[Strategy] = None
+    betting: Optional[BetPolicy] = None
+
+
+DEFAULT_ENTRANTS = (
+    ("basic", ""),
+    ("basic i18", "deviations=i18"),
+    ("hilo 1-8", "bet_policy=1-8"),
+    ("hilo 1-8 i18", "bet_policy=1-8,deviations=i18"),
+    ("hilo 1-12 i18", "bet_policy=1-12,deviations=i18"),
+)
+
+
+def parse_entrant(spec: str, cfg: RunConfig, rules: Rules, econ: SurvivalEconomy) -> Entrant:
+    # "label=field=value,field=value"; the label alone plays the base config.
+    label, _, overrides = spec.partition("=")
+    return Entrant(label.strip() or spec, *parse_overrides(overrides, cfg, rules, econ))
+
+
+def tournament_jobs(entrants: Sequence[Entrant], runs: int, root_seed: int) -> List[FarmJob]:
+    jobs = make_jobs([(e.label, e.cfg, e.rules, e.econ) for e in entrants], runs, root_seed)
+    by_label = {e.label: e for e in entrants}
+    if len(by_label) != len(entrants):
+        raise ValueError("entrant labels must be unique")
+    return [
+        FarmJob(j.index, j.replicate, j.label, j.cfg, j.rules, j.econ, j.seed,
+                by_label[j.label].strategy, by_label[j.label].betting)
+        for j in jobs
+    ]
+
+
+def _replicate_ev(results: Sequence[dict], label: str, runs: int) -> np.ndarray:
+    ev = np.full(runs, np.nan)
+    for r in results:
+        if r["label"] == label and r["hands"]:
+            ev[r["replicate"]] = r["profit"] / r["hands"]
+    return ev
+
+
+def _se(x: np.ndarray) -> float:
+    x = x[~np.isnan(x)]
+    return float(x.std(ddof=1) / np.sqrt(x.size)) if x.size > 1 else float("nan")
+
+
+def summarize_tournament(results: Sequence[dict], reference: Optional[str] = None) -> List[dict]:
+    # One row per entrant. ev_hand / sd_hand pool every hand played; diff is the mean
+    # per-replicate EV/hand difference to the reference entrant, with its paired standard
+    # error and the gain over the unpaired one (se_gain = unpaired se / paired se).
+    labels = list(dict.fromkeys(r["label"] for r in results))
+    if not labels:
+        return []
+    reference = reference or labels[0]
+    runs = max(r["replicate"] for r in results) + 1
+    ref_ev = _replicate_ev(results, reference, runs)
+    rows = []
+    for label in labels:
+        rs = [r for r in results if r["label"] == label]
+        hands = sum(r["hands"] for r in rs)
+        profit = sum(r["profit"] for r in rs)
+        mean = profit / max(1, hands)
+        var = max(0.0, sum(r["profit_sq"] for r in rs) / max(1, hands) - mean * mean)
+        wagered = sum(r["wagered"] for r in rs)
+        deaths = np.array([r["hands_to_death"] for r in rs if r["hands_to_death"] is not None], dtype=np.float64)
+        ev = _replicate_ev(results, label, runs)
+        diff = ev - ref_ev
+        paired = _se(diff)
+        unpaired = float(np.hypot(_se(ev), _se(ref_ev)))
+        rows.append({
+            "entrant": label,
+            "runs": len(rs),
+            "hands": hands,
+            "ev_hand": mean,
+            "se_hand": _se(ev),
+            "sd_hand": var ** 0.5,
+            "ev_bet": profit / wagered if wagered else float("nan"),
+            "avg_bet": wagered / max(1, hands),
+            "diff": float(np.nanmean(diff)) if label != reference else 0.0,
+            "diff_se": paired if label != reference else float("nan"),
+            "se_gain": unpaired / paired if label != reference and paired > 0 else float("nan"),
+            "death_rate": deaths.size / max(1, len(rs)),
+            "htd_median": float(np.median(deaths)) if deaths.size else float("nan"),
+            "hands_mean": hands / max(1, len(rs)),
+        })
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    ap = argparse.ArgumentParser(description="COUNTESS strategy tournament with common random numbers (simulation only)")
+    ap.add_argument("--runs", type=int, default=16, help="replicates (shared seeds) per entrant")
+    ap.add_argument("--seed", type=int, default=RunConfig.seed, help="root seed for SeedSequence")
+    ap.add_argument("--hands", type=int, default=50_000, help="hands_cap per run")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--entrant", action="append", default=[], metavar="LABEL=FIELD=V,...",
+                    help="entrant as RunConfig / Rules / SurvivalEconomy overrides (repeatable)")
+    ap.add_argument("--reference", default="", help="label the others are compared with (default: first)")
+    ap.add_argument("--csv", default="", help="write the summary table as CSV")
+    args = ap.parse_args(argv)
+
+    base = (RunConfig(hands_cap=args.hands), Rules(), SurvivalEconomy())
+    specs = args.entrant or [f"{label}={spec}" for label, spec in DEFAULT_ENTRANTS]
+    entrants = [parse_entrant(s, *base) for s in specs]
+    for e in entrants:
+        make_env(e.cfg, e.rules, np.random.default_rng(0), e.strategy, e.betting)  # build charts before forking
+    jobs = tournament_jobs(entrants, args.runs, args.seed)
+
+    t0 = time.perf_counter()
+    results = run_farm(jobs, args.workers)
+    dt = time.perf_counter() - t0
+
+    rows = summarize_tournament(results, args.reference or None)
+    print(format_table(rows))
+    total = sum(r["hands"] for r in results)
+    print(f"\n{len(entrants)} entrants × {args.runs} shared seeds · {total:,} hands · {dt:.1f}s")
+    if args.csv:
+        write_csv(args.csv, rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+# vecsim.py
+# COUNTESS — vectorized multi-shoe Monte Carlo engine (simulation only).
+# Plays one round on every shoe of a batch at once: shoes are rows of an integer-coded
+# card matrix, hand totals / soft flags are array state and strategy decisions are lookups
+# into the same StrategyTable as the scalar engine. A single shoe driven by the same
+# Generator plays exactly like BlackjackEnv.
+#
+# Run:
+#   python vecsim.py --shoes 10000 --rounds 200
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import numpy as np
+
+from engine import STRATEGY_ACTIONS, Rules, RoundResult, StrategyTable, make_shoe_cards, strategy_table
+from runlog import OUTCOME_CODES
+
+
+OUTCOMES = OUTCOME_CODES
+LOSE, PUSH, WIN, BJ = range(len(OUTCOMES))
+
+HIT, STAND, DOUBLE, SPLIT, DOUBLE_STAND = (STRATEGY_ACTIONS.index(a) for a in ("H", "S", "D", "P", "Ds"))
+
+
+# =========================
+# ENGINE
+# =========================
+class VecBlackjack:
+    def __init__(
+        self,
+        rules: Rules,
+        n_shoes: int,
+        rng: np.random.Generator,
+        strategy: Optional[StrategyTable] = None,
+    ):
+        self.rules = rules
+        self.n_shoes = int(n_shoes)
+        self.rng = rng
+
+        base = np.array([c[2] for c in make_shoe_cards(rules.decks)], dtype=np.int8)
+        self.n_cards = int(base.size)
+        self.cut = int(self.n_cards * (1 - rules.penetration))
+        self.cards = np.tile(base, (self.n_shoes, 1))
+        self.pos = np.zeros(self.n_shoes, dtype=np.int64)
+        for s in range(self.n_shoes):
+            self.rng.shuffle(self.cards[s])
+
+        self.strategy = strategy if strategy is not None else strategy_table(rules)
+
+    def remaining(self) -> np.ndarray:
+        return self.n_cards - self.pos
+
+    def _deal(self, rows: np.ndarray) -> np.ndarray:
+        c = self.cards[rows, self.pos[rows]].astype(np.int16)
+        self.pos[rows] += 1
+        return c
+
+    def play_round(self, bet: float = 1.0) -> Dict[str, np.ndarray]:
+        rules = self.rules
+        n = self.n_shoes
+        slots = rules.max_splits + 1
+        every = np.arange(n)
+
+        reshuffle = self.remaining() < self.cut
+        for s in np.flatnonzero(reshuffle):
+            self.rng.shuffle(self.cards[s])
+        self.pos[reshuffle] = 0
+
+        p1 = self._deal(every)
+        d1 = self._deal(every)
+        p2 = self._deal(every)
+        d2 = self._deal(every)
+        up = d1
+
+        # Per-shoe hand slots; split hands are appended after the current last slot.
+        hard = np.zeros((n, slots), dtype=np.int16)
+        aces = np.zeros((n, slots), dtype=np.int16)
+        ncards = np.zeros((n, slots), dtype=np.int16)
+        first = np.zeros((n, slots), dtype=np.int16)
+        second = np.zeros((n, slots), dtype=np.int16)
+        doubled = np.zeros((n, slots), dtype=bool)
+        split_aces = np.zeros((n, slots), dtype=bool)
+        from_split = np.zeros((n, slots), dtype=bool)
+        hard[:, 0] = p1 + p2
+        aces[:, 0] = (p1 == 1).astype(np.int16) + (p2 == 1)
+        ncards[:, 0] = 2
+        first[:, 0] = p1
+        second[:, 0] = p2
+        nhands = np.ones(n, dtype=np.int64)
+        splits = np.zeros(n, dtype=np.int64)
+        cur = np.zeros(n, dtype=np.int64)
+
+        # Player: every shoe takes one decision on its current hand per pass.
+        while True:
+            rows = np.flatnonzero(cur < nhands)
+            if rows.size == 0:
+                break
+            h = cur[rows]
+            hd = hard[rows, h]
+            nc = ncards[rows, h]
+            sa = split_aces[rows, h]
+            is_soft = (aces[rows, h] > 0) & (hd + 10 <= 21)
+            total = hd + 10 * is_soft
+            is_pair = (nc == 2) & (first[rows, h] == second[rows, h])
+            can_split = (splits[rows] < rules.max_splits) & is_pair & (~sa | rules.allow_resplit_aces)
+            live = (total < 21) & ~(sa & ~can_split)
+
+            t = np.minimum(total, 21)
+            u = up[rows]
+            table = self.strategy
+            action = np.where(
+                can_split,
+                table.pair[first[rows, h], u],
+                np.where(is_soft, table.soft[t, u], table.hard[t, u]),
+            )
+            wants_double = (action == DOUBLE) | (action == DOUBLE_STAND)
+            can_double = (nc == 2) & (rules.double_after_split | ~from_split[rows, h])
+            do_split = live & (action == SPLIT) & can_split
+            do_double = live & wants_double & can_double
+            do_stand = live & ((action == STAND) | ((action == DOUBLE_STAND) & ~can_double))
+            do_hit = live & ~do_split & ~do_double & ~do_stand
+
+            if do_split.any():
+                r = rows[do_split]
+                hh = h[do_split]
+                c0 = first[r, hh]
+                c1 = second[r, hh]
+                a = self._deal(r)
+                b = self._deal(r)
+                k = nhands[r]
+                nhands[r] += 1
+                splits[r] += 1
+                hard[r, hh] = c0 + a
+                aces[r, hh] = (c0 == 1).astype(np.int16) + (a == 1)
+                second[r, hh] = a
+                hard[r, k] = c1 + b
+                aces[r, k] = (c1 == 1).astype(np.int16) + (b == 1)
+                ncards[r, k] = 2
+                first[r, k] = c1
+                second[r, k] = b
+                from_split[r, hh] = True
+                from_split[r, k] = True
+                split_aces[r, hh] |= c0 == 1
+                split_aces[r, k] = c0 == 1
+
+            drew = do_double | do_hit
+            if drew.any():
+                r = rows[drew]
+                hh = h[drew]
+                c = self._deal(r)
+                hard[r, hh] += c
+                aces[r, hh] += c == 1
+                ncards[r, hh] += 1
+                doubled[r, hh] |= do_double[drew]
+
+            cur[rows] += ~live | do_double | do_stand
+
+        # Dealer
+        d_hard = d1 + d2
+        d_aces = (d1 == 1).astype(np.int16) + (d2 == 1)
+        dealer_bj = ((d1 == 1) & (d2 == 10)) | ((d1 == 10) & (d2 == 1))
+        while True:
+            d_soft = (d_aces > 0) & (d_hard + 10 <= 21)
+            dealer_total = d_hard + 10 * d_soft
+            hit = (dealer_total < 17) | ((dealer_total == 17) & d_soft & (not rules.dealer_stands_soft_17))
+            rows = np.flatnonzero(hit)
+            if rows.size == 0:
+                break
+            c = self._deal(rows)
+            d_hard[rows] += c
+            d_aces[rows] += c == 1
+
+        # Settle
+        valid = np.arange(slots)[None, :] < nhands[:, None]
+        p_soft = (aces > 0) & (hard + 10 <= 21)
+        p_total = hard + 10 * p_soft
+        player_bj = (ncards == 2) & (p_total == 21) & ~split_aces
+        dbj = dealer_bj[:, None]
+        dt = dealer_total[:, None]
+        out = np.select(
+            [p_total > 21, player_bj & ~dbj, dbj & ~player_bj, dt > 21, p_total > dt, p_total < dt],
+            [LOSE, BJ, LOSE, WIN, WIN, LOSE],
+            PUSH,
+        )
+        hand_bet = np.where(doubled, 2.0 * bet, float(bet))
+        pnl = np.select(
+            [out == LOSE, out == BJ, out == WIN],
+            [-hand_bet, hand_bet * rules.blackjack_payout, hand_bet],
+            0.0,
+        )
+        profit = np.where(valid, pnl, 0.0).sum(axis=1)
+
+        outcome = np.select(
+            [(valid & (out == BJ)).any(axis=1), (valid & (out == WIN)).any(axis=1), (valid & (out == LOSE)).any(axis=1)],
+            [BJ, WIN, LOSE],
+            PUSH,
+        ).astype(np.int8)
+
+        return {
+            "profit": profit,
+            "outcome": outcome,
+            "dealer_total": dealer_total.astype(np.int16),
+            "player_hands": nhands.astype(np.int8),
+            "reshuffle": reshuffle,
+            "shoe_remaining": self.remaining(),
+        }
+
+
+# =========================
+# BATCH RESULTS
+# =========================
+@dataclass
+class VecResult:
+    bet: float
+    profit: np.ndarray        # (rounds, shoes) float64
+    outcome: np.ndarray       # (rounds, shoes) int8 codes into OUTCOMES
+    dealer_total: np.ndarray  # (rounds, shoes) int16
+    player_hands: np.ndarray  # (rounds, shoes) int8
+
+    @property
+    def hands(self) -> int:
+        return int(self.profit.size)
+
+    def round_result(self, round_i: int, shoe: int) -> RoundResult:
+        return RoundResult(
+            profit=float(self.profit[round_i, shoe]),
+            bet=float(self.bet),
+            outcome=OUTCOMES[int(self.outcome[round_i, shoe])],
+            dealer_total=int(self.dealer_total[round_i, shoe]),
+            player_hands=int(self.player_hands[round_i, shoe]),
+        )
+
+    def summary(self) -> dict:
+        n = max(1, self.hands)
+        counts = np.bincount(self.outcome.ravel(), minlength=len(OUTCOMES))
+        out = {
+            "hands": self.hands,
+            "ev_per_hand": float(self.profit.mean()) if self.hands else 0.0,
+            "std_per_hand": float(self.profit.std()) if self.hands else 0.0,
+            "splits_per_hand": float((self.player_hands - 1).sum() / n),
+        }
+        for name, k in zip(OUTCOMES, counts):
+            out[f"{name.lower()}_rate"] = float(k / n)
+        return out
+
+
+def simulate(
+    rules: Rules,
+    n_shoes: int,
+    rounds: int,
+    seed: Optional[int] = None,
+    bet: float = 1.0,
+    rng: Optional[np.random.Generator] = None,
+) -> VecResult:
+    rng = rng if rng is not None else np.random.default_rng(seed)
+    eng = VecBlackjack(rules, n_shoes, rng)
+    profit = np.empty((rounds, n_shoes), dtype=np.float64)
+    outcome = np.empty((rounds, n_shoes), dtype=np.int8)
+    dealer_total = np.empty((rounds, n_shoes), dtype=np.int16)
+    player_hands = np.empty((rounds, n_shoes), dtype=np.int8)
+    for i in range(rounds):
+        r = eng.play_round(bet)
+        profit[i] = r["profit"]
+        outcome[i] = r["outcome"]
+        dealer_total[i] = r["dealer_total"]
+        player_hands[i] = r["player_hands"]
+    return VecResult(float(bet), profit, outcome, dealer_total, player_hands)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="COUNTESS vectorized blackjack simulator (simulation only)")
+    ap.add_argument("--shoes", type=int, default=10_000)
+    ap.add_argument("--rounds", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--decks", type=int, default=Rules.decks)
+    ap.add_argument("--h17", action="store_true", help="dealer hits soft 17")
+    args = ap.parse_args()
+
+    rules = Rules(decks=args.decks, dealer_stands_soft_17=not args.h17)
+    t0 = time.perf_counter()
+    res = simulate(rules, args.shoes, args.rounds, seed=args.seed)
+    dt = time.perf_counter() - t0
+    for k, v in res.summary().items():
+        print(f"{k:>16}: {v:.6f}" if isinstance(v, float) else f"{k:>16}: {v}")
+    print(f"{'hands/sec':>16}: {res.hands / max(dt, 1e-9):,.0f}")
+
+
+if __name__ == "__main__":
+    main()